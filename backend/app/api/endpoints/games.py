@@ -1,12 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.models.models import User, Game, GameStatus, GameMode
+from app.db.database import SessionLocal, get_db
+from app.models.models import User, UserRole, Game, GameStatus, GameMode
 from app.schemas.schemas import GameCreate, GameResponse, GameMove
+from app.games.draughts_engine import compact_board_state, expand_board_state
 from app.api.endpoints.auth import get_current_user
 from app.services.game_service import GameService
-from typing import List
+from app.services.ai_executor import AIExecutor, get_ai_executor
+from app.services.game_clock import flag_scheduler
+from app.services.game_events import game_events
+from app.services.search_metrics import search_metrics
+from app.services.game_moves import replay
+from typing import List, Literal, Optional
 from datetime import datetime
+import asyncio
+import json
 
 router = APIRouter()
 
@@ -70,12 +80,15 @@ def create_game(
             existing_game.player2_id = current_user.id
             existing_game.player2_rating_before = current_user.rating
             existing_game.status = GameStatus.IN_PROGRESS
+            existing_game.current_turn = existing_game.player1_id
             existing_game.started_at = datetime.utcnow()
             existing_game.last_move_time = datetime.utcnow()
             current_user.balance -= existing_game.bet_amount
             
             db.commit()
             db.refresh(existing_game)
+            game_events.publish(existing_game.id, GameService.state_event(existing_game))
+            flag_scheduler.schedule_game(existing_game)
             
             return existing_game
         else:
@@ -106,18 +119,27 @@ def create_game(
 
 
 @router.post("/move")
-def make_move(
+async def make_move(
     move_data: GameMove,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    ai_executor: AIExecutor = Depends(get_ai_executor)
 ):
-    """Make a move in a game."""
-    success, error, board_state = GameService.make_move(
+    """
+    Make a move in a game.
+    With wait_for_ai=false the AI's reply in a vs-AI game is played in the
+    background; poll GET /games/{game_id} until ai_thinking is false.
+    """
+    success, error, board_state = await GameService.make_move_async(
         db,
         move_data.game_id,
         current_user.id,
         move_data.from_position,
-        move_data.to_position
+        move_data.to_position,
+        ai_executor,
+        move_data.wait_for_ai,
+        move_data.path
     )
     
     if not success:
@@ -126,9 +148,19 @@ def make_move(
             detail=error
         )
     
+    game = await asyncio.to_thread(lambda: db.query(Game).filter(Game.id == move_data.game_id).first())
+    if game.ai_thinking:
+        background_tasks.add_task(GameService.play_ai_reply, game.id, ai_executor)
+    
+    if move_data.board_format == "fen":
+        board_state = compact_board_state(board_state)
+    else:
+        board_state = expand_board_state(board_state)
+    
     return {
         "success": True,
         "board_state": board_state,
+        "ai_thinking": bool(game.ai_thinking),
         "message": "Move made successfully"
     }
 
@@ -144,7 +176,7 @@ def get_active_games(
         Game.status == GameStatus.IN_PROGRESS
     ).all()
     
-    return games
+    return [GameService.apply_live_state(game) for game in games]
 
 
 @router.get("/history", response_model=List[GameResponse])
@@ -179,11 +211,15 @@ def get_waiting_games(
 @router.get("/{game_id}", response_model=GameResponse)
 def get_game(
     game_id: int,
+    board_format: Literal["board", "fen"] = "board",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get specific game details."""
-    game = db.query(Game).filter(Game.id == game_id).first()
+    """
+    Get specific game details.
+    With board_format=fen the board state is the compact position string.
+    """
+    game = GameService.get_game(db, game_id)
     
     if not game:
         raise HTTPException(
@@ -198,9 +234,144 @@ def get_game(
             detail="You are not part of this game"
         )
     
+    if board_format == "fen" and game.board_state:
+        # Returned as is: the response model would expand the position again
+        response = GameResponse.model_validate(game)
+        response.board_state = compact_board_state(game.board_state)
+        return JSONResponse(jsonable_encoder(response))
+    
     return game
 
 
+@router.get("/{game_id}/debug")
+def get_game_debug(
+    game_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the game's position and the statistics of its last AI search
+    (nodes, depth, TT hits, cutoffs, move generation and evaluation time,
+    principal variation). Search statistics need AI_SEARCH_STATS.
+    Admins only: the principal variation holds the engine's best reply for
+    the player to move.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admins only"
+        )
+    
+    game = GameService.get_game(db, game_id)
+    
+    if not game:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game not found"
+        )
+    
+    from app.core.config import settings
+    return {
+        "game_id": game.id,
+        "board_state": compact_board_state(game.board_state) if game.board_state else None,
+        "ai_thinking": bool(game.ai_thinking),
+        "search_stats_enabled": settings.AI_SEARCH_STATS,
+        "last_search": search_metrics.last_search(game.id)
+    }
+
+
+@router.get("/{game_id}/moves")
+def get_game_moves(
+    game_id: int,
+    from_ply: int = Query(1, ge=1),
+    to_ply: Optional[int] = Query(None, ge=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream the game's moves from from_ply to to_ply, one JSON object per line.
+    Squares are [row, col]; clock is the mover's time left after the move.
+    """
+    game = db.query(Game).filter(Game.id == game_id).first()
+    
+    if not game:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game not found"
+        )
+    
+    if game.player1_id != current_user.id and game.player2_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not part of this game"
+        )
+    
+    in_progress = game.status == GameStatus.IN_PROGRESS
+    
+    def lines():
+        # The request's session is closed before the body is streamed
+        stream_db = SessionLocal()
+        try:
+            for move in GameService.iter_game_moves(stream_db, game_id, in_progress, from_ply, to_ply):
+                yield json.dumps({key: move[key] for key in MOVE_FIELDS}) + "\n"
+        finally:
+            stream_db.close()
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+# Fields of a move in the moves stream
+MOVE_FIELDS = ("ply", "player", "from", "to", "path", "captured", "clock", "played_at")
+
+
+@router.get("/{game_id}/position")
+def get_game_position(
+    game_id: int,
+    ply: int = Query(..., ge=0),
+    board_format: Literal["board", "fen"] = "board",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the position after a ply of the game (0 for the start), replayed
+    from the stored moves up to that ply only.
+    """
+    game = db.query(Game).filter(Game.id == game_id).first()
+    
+    if not game:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game not found"
+        )
+    
+    if game.player1_id != current_user.id and game.player2_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not part of this game"
+        )
+    
+    moves = GameService.iter_game_moves(db, game.id, game.status == GameStatus.IN_PROGRESS, to_ply=ply)
+    try:
+        engine = replay(moves, ply)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    
+    if len(engine.move_history) != ply:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"The game has {len(engine.move_history)} plies"
+        )
+    
+    return {
+        "game_id": game.id,
+        "ply": ply,
+        "board_state": engine.get_board_state(compact=board_format == "fen")
+    }
+
+
 @router.post("/{game_id}/join")
 def join_game(
     game_id: int,
@@ -249,15 +420,18 @@ def join_game(
     # Initialize board
     from app.games.draughts_engine import DraughtsEngine
     engine = DraughtsEngine()
-    game.board_state = engine.get_board_state()
+    game.board_state = engine.get_board_state(compact=True)
     
     # Deduct bet from player 2
     current_user.balance -= bet_amount
     
     db.commit()
     db.refresh(game)
+    game_events.publish(game.id, GameService.state_event(game))
+    flag_scheduler.schedule_game(game)
     
-    return {"message": "Successfully joined game", "game": game}
+    # Through GameResponse, as the other handlers, for the expanded board
+    return {"message": "Successfully joined game", "game": GameResponse.model_validate(game)}
 
 
 @router.post("/{game_id}/forfeit")
@@ -290,5 +464,6 @@ def forfeit_game(
     # Determine winner (opponent)
     winner = 2 if current_user.id == game.player1_id else 1
     GameService.end_game(db, game, winner)
+    GameService.publish(game.id, GameService.update_events(game, [], 0))
     
     return {"message": "Game forfeited"}
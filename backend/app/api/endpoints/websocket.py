@@ -0,0 +1,118 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from app.db.database import SessionLocal
+from app.models.models import User, Game
+from app.core.security import decode_access_token
+from app.services.game_service import GameService
+from app.services.ai_executor import get_ai_executor
+from app.services.game_events import game_events
+from typing import Optional
+import asyncio
+import json
+
+router = APIRouter()
+
+
+def authenticate(token: Optional[str]) -> Optional[int]:
+    """The id of the user a token belongs to, or None if it is invalid."""
+    payload = decode_access_token(token) if token else None
+    if payload is None or payload.get("sub") is None:
+        return None
+    
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == int(payload["sub"])).first()
+        return user.id if user and user.is_active else None
+    finally:
+        db.close()
+
+
+def load_state(game_id: int) -> Optional[dict]:
+    """A game's state event, or None if there is no such game."""
+    db = SessionLocal()
+    try:
+        game = GameService.get_game(db, game_id)
+        return GameService.state_event(game) if game else None
+    finally:
+        db.close()
+
+
+async def play_move(game_id: int, user_id: int, message: dict) -> Optional[str]:
+    """Play a move received over a socket. Returns the error message, if any."""
+    try:
+        from_pos = tuple(message["from"])
+        to_pos = tuple(message["to"])
+        path = [tuple(square) for square in message.get("path") or []]
+    except (KeyError, TypeError):
+        return "A move needs from and to squares"
+    
+    executor = await asyncio.to_thread(get_ai_executor)
+    db = SessionLocal()
+    try:
+        success, error, _ = await GameService.make_move_async(
+            db, game_id, user_id, from_pos, to_pos, executor, wait_for_ai=False, path=path or None
+        )
+        if not success:
+            return error
+        
+        game = await asyncio.to_thread(lambda: db.query(Game).filter(Game.id == game_id).first())
+        if game.ai_thinking:
+            GameService.start_ai_reply(game_id, executor)
+        return None
+    finally:
+        db.close()
+
+
+@router.websocket("/game/{game_id}")
+async def game_socket(websocket: WebSocket, game_id: int, token: Optional[str] = None):
+    """
+    Live updates of a game, for its players and spectators.
+    The connection is authenticated once, by the token query parameter.
+    The first message is the game's state; after that the server sends a
+    move delta for each move, a clock message after each update and a
+    game_over message when the game ends. Players send their moves as
+    {"type": "move", "from": [row, col], "to": [row, col], "path": [...]}.
+    """
+    user_id = await asyncio.to_thread(authenticate, token)
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    
+    # Subscribe before loading the state so no update falls in between;
+    # clients skip move deltas whose ply the state already includes
+    queue = game_events.subscribe(game_id)
+    sender = None
+    try:
+        state = await asyncio.to_thread(load_state, game_id)
+        if state is None:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Game not found")
+            return
+        await websocket.send_json(state)
+        
+        # Every later message, errors included, goes out through the queue
+        async def send_events():
+            while True:
+                await websocket.send_json(await queue.get())
+        
+        sender = asyncio.create_task(send_events())
+        
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                message = None
+            if not isinstance(message, dict) or message.get("type") != "move":
+                queue.put_nowait({"type": "error", "detail": "Unknown message type"})
+                continue
+            
+            # Spectators are refused by the turn check
+            error = await play_move(game_id, user_id, message)
+            if error:
+                queue.put_nowait({"type": "error", "detail": error})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if sender:
+            sender.cancel()
+        game_events.unsubscribe(game_id, queue)
@@ -38,6 +38,58 @@ class Settings(BaseSettings):
         "expert": {"depth": 8, "rating": 2000}
     }
     
+    # Legal moves cached per position for validation, game-over checks and AI roots
+    MOVE_CACHE_SIZE: int = 4096
+    
+    # AI transposition tables (kept per game between moves)
+    AI_TT_SIZE_MB: float = 8
+    AI_TT_MAX_GAMES: int = 64
+    
+    # AI executor: "process" searches in a worker process pool, "inline" in a thread
+    AI_EXECUTOR: str = "process"
+    AI_WORKERS: int = 0  # 0 = one per CPU core, minus one for the API
+    AI_MAX_QUEUE: int = 32  # Jobs in the workers, abandoned ones included, before falling back
+    AI_JOB_TIMEOUT: float = 10.0  # Seconds before a search is abandoned
+    # Shallow search answering for the inline executor when the full one fails; the
+    # process executor answers with a one-ply pick, to keep searches out of the API process
+    AI_FALLBACK_DEPTH: int = 2
+    AI_FALLBACK_TIME_BUDGET: float = 0.1
+    
+    # Root-split parallel search: worker processes per search (1 = serial)
+    AI_PARALLEL_WORKERS: int = 1
+    AI_PARALLEL_DIFFICULTIES: List[str] = ["hard", "expert"]
+    
+    # Opening book built by `python -m app.games.opening_book`; skipped if missing
+    AI_OPENING_BOOK_PATH: str = "opening_book.bin"
+    
+    # Endgame tablebase built by `python -m app.games.endgame_tablebase`; skipped if missing
+    AI_TABLEBASE_PATH: str = "endgame_tablebase.bin"
+    # End live games on reaching a tablebase position, won or drawn as perfect play
+    # would finish them, instead of playing them out. Off by default, since it
+    # settles bets on the tablebase's verdict
+    GAME_TABLEBASE_ADJUDICATION: bool = False
+    
+    # Score the last ply of the search in NumPy batches (needs NumPy). Off by default:
+    # with material and advancement only, the incremental evaluate_board is cheaper
+    AI_BATCH_EVAL: bool = False
+    
+    # Per-search statistics for /metrics and the game debug endpoint (times move
+    # generation and evaluation, so off by default)
+    AI_SEARCH_STATS: bool = False
+    
+    # Live game store: engines of in-progress games stay resident and moves go to a
+    # move log, flushed to the database every GAME_FLUSH_MOVES plies and at game end.
+    # "memory" keeps the log in this process: run one API process, or set
+    # GAME_FLUSH_MOVES=1, and a crash loses the plies not flushed. "redis" keeps it
+    # in REDIS_URL (needs the redis package), replayed at startup after a crash
+    GAME_STORE: str = "memory"
+    GAME_FLUSH_MOVES: int = 8
+    
+    # Game events for WebSocket clients: "memory" reaches the sockets of this process
+    # only; "redis" publishes through REDIS_URL to every API process (needs the redis
+    # package), for running several workers or hosts
+    GAME_EVENTS: str = "memory"
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,251 @@
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Tuple
+from app.games.draughts_ai import DraughtsAI
+from app.games.draughts_engine import DraughtsEngine
+
+
+Move = Tuple[Tuple[int, int], ...]
+
+# Engine configuration keys and how to read their values
+CONFIG_KEYS = {
+    "name": str,
+    "difficulty": str,
+    "depth": int,  # Deepest iteration, instead of the difficulty's
+    "time": float,  # Seconds per move, instead of the difficulty's
+    "nodes": int,  # Nodes per move; without time, no time limit
+    "ordering": lambda value: value not in ("off", "false", "0"),
+}
+
+
+def parse_config(spec: str) -> dict:
+    """Read an engine configuration such as "difficulty=hard,depth=6,nodes=20000"."""
+    config = {"difficulty": "expert"}
+    for item in filter(None, spec.split(",")):
+        key, _, value = item.partition("=")
+        if key not in CONFIG_KEYS or not value:
+            raise ValueError(f"Invalid engine option {item!r}; options are {', '.join(CONFIG_KEYS)}")
+        config[key] = CONFIG_KEYS[key](value)
+    config.setdefault("name", spec)
+    return config
+
+
+def make_ai(config: dict) -> DraughtsAI:
+    """A DraughtsAI set up as a configuration says, without random moves."""
+    time_budget = config.get("time")
+    if time_budget is None and "nodes" in config:
+        time_budget = float("inf")
+    ai = DraughtsAI(config["difficulty"], time_budget=time_budget, max_nodes=config.get("nodes"))
+    if "depth" in config:
+        ai.max_depth = config["depth"]
+    ai.move_ordering = config.get("ordering", True)
+    ai.random_moves = False
+    return ai
+
+
+def random_openings(count: int, plies: int, seed: int) -> Iterator[List[Move]]:
+    """Openings of random legal moves that leave the game in progress."""
+    rng = random.Random(seed)
+    found = 0
+    while found < count:
+        engine = DraughtsEngine()
+        moves = []
+        for _ in range(plies):
+            legal = engine.get_all_valid_moves_for_player(engine.current_player)
+            if not legal:
+                break
+            move = rng.choice(legal)
+            engine.push_move(move)
+            moves.append(move)
+        if len(moves) == plies and not engine.is_game_over()[0]:
+            found += 1
+            yield moves
+
+
+def play_game(opening: List[Move], first: dict, second: dict, max_plies: int) -> dict:
+    """
+    Play one game from an opening, first moving first. Repeating a position
+    for the third time or reaching max_plies is a draw. Runs in a worker.
+    """
+    engine = DraughtsEngine()
+    for move in opening:
+        engine.make_move(move[0], move[-1], list(move[1:-1]))
+    configs = {engine.current_player: first, 3 - engine.current_player: second}
+    ais = {player: make_ai(config) for player, config in configs.items()}
+    seen = {}
+    start = time.perf_counter()
+    
+    while True:
+        is_over, winner = engine.is_game_over()
+        if is_over:
+            reason = "no moves" if winner is not None else "draw"
+            break
+        seen[engine.hash] = seen.get(engine.hash, 0) + 1
+        if seen[engine.hash] >= 3:
+            winner, reason = None, "repetition"
+            break
+        if len(engine.move_history) >= max_plies:
+            winner, reason = None, "move limit"
+            break
+        move = ais[engine.current_player].get_best_move(engine)
+        engine.make_move(move[0], move[-1], list(move[1:-1]))
+    
+    return {
+        "player1": configs[1]["name"],
+        "player2": configs[2]["name"],
+        "winner": configs[winner]["name"] if winner is not None else None,
+        "result": {1: "1-0", 2: "0-1", None: "1/2-1/2"}[winner],
+        "reason": reason,
+        "opening_plies": len(opening),
+        "plies": len(engine.move_history),
+        "seconds": time.perf_counter() - start,
+        "move_history": engine.move_history,
+    }
+
+
+def expected_score(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def elo_difference(score: float) -> float:
+    """Elo difference for an expected score, infinite at 0 and 1."""
+    if score <= 0:
+        return float("-inf")
+    if score >= 1:
+        return float("inf")
+    return -400 * math.log10(1 / score - 1)
+
+
+def score_stats(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    """(mean score, per-game score variance) of a result tally."""
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    return score, variance
+
+
+def elo_estimate(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    """Elo difference and the half-width of its 95% confidence interval."""
+    score, variance = score_stats(wins, draws, losses)
+    margin = 1.96 * math.sqrt(variance / (wins + draws + losses))
+    low, high = elo_difference(score - margin), elo_difference(score + margin)
+    return elo_difference(score), (high - low) / 2
+
+
+def sprt_llr(wins: int, draws: int, losses: int, elo0: float, elo1: float) -> float:
+    """
+    Log-likelihood ratio of H1 (difference elo1) against H0 (elo0), by the
+    normal approximation to the score distribution.
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0
+    score, variance = score_stats(wins, draws, losses)
+    if variance == 0:
+        return 0.0
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return games * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+
+def sprt_bounds(alpha: float, beta: float) -> Tuple[float, float]:
+    """(accept H0, accept H1) log-likelihood ratio bounds."""
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def parse_sprt(spec: str) -> Dict[str, float]:
+    """Read SPRT parameters such as "elo0=0,elo1=10,alpha=0.05,beta=0.05"."""
+    params = {"elo0": 0.0, "elo1": 10.0, "alpha": 0.05, "beta": 0.05}
+    for item in filter(None, spec.split(",")):
+        key, _, value = item.partition("=")
+        if key not in params:
+            raise ValueError(f"Invalid SPRT option {item!r}")
+        params[key] = float(value)
+    return params
+
+
+def main():
+    """Play two DraughtsAI configurations against each other and estimate the Elo difference."""
+    import argparse
+    
+    def config(spec):
+        try:
+            return parse_config(spec)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+    
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--engine-a", type=config, required=True,
+                        help='Configuration under test, e.g. "name=new,difficulty=hard,nodes=20000"')
+    parser.add_argument("--engine-b", type=config, required=True, help="Baseline configuration")
+    parser.add_argument("--games", type=int, default=100, help="Most games; played in pairs with colours swapped")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--opening-plies", type=int, default=4, help="Random moves before the engines take over")
+    parser.add_argument("--max-plies", type=int, default=300, help="Plies before a game is drawn")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--sprt", type=parse_sprt, help='Stop early by SPRT, e.g. "elo0=0,elo1=10,alpha=0.05,beta=0.05"')
+    parser.add_argument("--output", help="Write every game, with its move_history, here as JSON lines")
+    args = parser.parse_args()
+    
+    engine_a, engine_b = args.engine_a, args.engine_b
+    if engine_a["name"] == engine_b["name"]:
+        engine_a["name"] += " (a)"
+        engine_b["name"] += " (b)"
+    bounds = sprt_bounds(args.sprt["alpha"], args.sprt["beta"]) if args.sprt else None
+    
+    wins = draws = losses = 0
+    verdict = None
+    output = open(args.output, "w") if args.output else None
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(max_workers=args.workers)
+    try:
+        jobs = []
+        for opening in random_openings((args.games + 1) // 2, args.opening_plies, args.seed):
+            jobs.append(pool.submit(play_game, opening, engine_a, engine_b, args.max_plies))
+            jobs.append(pool.submit(play_game, opening, engine_b, engine_a, args.max_plies))
+        jobs = jobs[:args.games]
+        
+        for job in as_completed(jobs):
+            game = job.result()
+            if game["winner"] == engine_a["name"]:
+                wins += 1
+            elif game["winner"] is None:
+                draws += 1
+            else:
+                losses += 1
+            if output:
+                output.write(json.dumps(game) + "\n")
+            
+            played = wins + draws + losses
+            elo, margin = elo_estimate(wins, draws, losses)
+            line = f"{played:>6} games  +{wins} ={draws} -{losses}  Elo {elo:+.1f} +/- {margin:.1f}"
+            if bounds:
+                llr = sprt_llr(wins, draws, losses, args.sprt["elo0"], args.sprt["elo1"])
+                line += f"  LLR {llr:+.2f} [{bounds[0]:.2f}, {bounds[1]:.2f}]"
+                if llr <= bounds[0]:
+                    verdict = "H0 accepted"
+                elif llr >= bounds[1]:
+                    verdict = "H1 accepted"
+            print(line, flush=True)
+            if verdict:
+                break
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if output:
+            output.close()
+    
+    played = wins + draws + losses
+    elo, margin = elo_estimate(wins, draws, losses)
+    print(f"{engine_a['name']} vs {engine_b['name']}: {played} games in {time.perf_counter() - start:.1f}s, "
+          f"+{wins} ={draws} -{losses}, Elo {elo:+.1f} +/- {margin:.1f} (95%)")
+    if args.sprt:
+        print(f"SPRT elo0={args.sprt['elo0']:g} elo1={args.sprt['elo1']:g}: {verdict or 'inconclusive'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+from typing import List, Optional, Sequence
+from app.games.draughts_engine import SQUARES
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; without it leaves are scored one at a time
+    np = None
+
+
+def encode_board(board: List[List[int]]) -> List[int]:
+    """The piece on each playable square, in the order of SQUARES."""
+    return [board[row][col] for row, col in SQUARES]
+
+
+class BatchEvaluator:
+    """
+    Scores many positions at once with NumPy, using the same terms and
+    weights as DraughtsEngine.evaluate_board so either gives the same score.
+    Positions are the rows of an N x 32 array holding the piece on each
+    playable square (see encode_board). Further terms are whole-array
+    operations here instead of per-position Python loops.
+    DraughtsAI scores its last ply with one when AI_BATCH_EVAL is set. With
+    only material and advancement the incremental evaluate_board is still
+    cheaper (benchmarks/batch_eval.py), so the setting is off by default.
+    """
+    
+    MAN_VALUE = 3
+    KING_VALUE = 5
+    ADVANCEMENT_VALUE = 0.1
+    
+    def __init__(self):
+        rows = np.array([row for row, _ in SQUARES], dtype=np.int64)
+        # Rows a man on each square has advanced, by player
+        self.advancement = np.zeros((3, 32), dtype=np.int64)
+        self.advancement[1] = 7 - rows
+        self.advancement[2] = rows
+    
+    def evaluate(self, positions: Sequence[Sequence[int]], player: int) -> "np.ndarray":
+        """Score every position for a player, as evaluate_board would."""
+        positions = np.asarray(positions, dtype=np.int8)
+        opponent = 3 - player
+        own_men = positions == player
+        men = own_men.sum(axis=1) - (positions == opponent).sum(axis=1)
+        kings = (positions == -player).sum(axis=1) - (positions == -opponent).sum(axis=1)
+        advancement = own_men @ self.advancement[player]
+        return (men * self.MAN_VALUE + kings * self.KING_VALUE) + advancement * self.ADVANCEMENT_VALUE
+    
+    def evaluate_boards(self, boards: Sequence[List[List[int]]], player: int) -> "np.ndarray":
+        """Score 8x8 boards for a player."""
+        return self.evaluate([encode_board(board) for board in boards], player)
+
+
+def load_batch_evaluator() -> Optional[BatchEvaluator]:
+    """A batch evaluator, or None if NumPy is not installed."""
+    if np is None:
+        return None
+    return BatchEvaluator()
@@ -1,17 +1,82 @@
 from typing import Tuple, Optional
-import copy
 import random
+import time
+from types import SimpleNamespace
+from app.games.batch_eval import BatchEvaluator, encode_board
 from app.games.draughts_engine import DraughtsEngine
+from app.games.endgame_tablebase import Tablebase, probe_score
+from app.games.move_cache import LegalMoveCache
+from app.games.opening_book import OpeningBook
+from app.games.search_stats import SearchStats, timed
+from app.games.transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget has run out."""
 
 
 class DraughtsAI:
     """
     AI opponent for Draughts using Minimax algorithm with alpha-beta pruning.
+    Pass the same transposition table for every move of a game to reuse the
+    previous turn's work; set transposition_table to None to search without one.
+    The search deepens one ply at a time up to max_depth and stops when the
+    time budget (seconds) runs out; pass time_budget=float("inf") to always
+    search to max_depth. max_nodes limits the nodes searched the same way,
+    checked at the same interval as the clock. With a batch_evaluator, the children of each
+    node one ply above the leaves are scored together in one batch.
+    With collect_stats, each move choice leaves a SearchStats in stats.
     """
     
-    def __init__(self, difficulty: str = "expert"):
+    TIME_CHECK_INTERVAL = 256  # Nodes between clock checks
+    TIE_MARGIN = 1e-6  # Far below the 0.1 granularity of evaluate_board
+    
+    # Move ordering priorities; history scores stay far below these
+    PV_MOVE_SCORE = 4e9
+    HASH_MOVE_SCORE = 3e9
+    PROMOTION_SCORE = 2e9
+    KILLER_MOVE_SCORE = 1e9
+    
+    def __init__(
+        self,
+        difficulty: str = "expert",
+        transposition_table: Optional[TranspositionTable] = None,
+        time_budget: Optional[float] = None,
+        opening_book: Optional[OpeningBook] = None,
+        tablebase: Optional[Tablebase] = None,
+        move_cache: Optional[LegalMoveCache] = None,
+        batch_evaluator: Optional[BatchEvaluator] = None,
+        collect_stats: bool = False,
+        max_nodes: Optional[int] = None
+    ):
         self.difficulty = difficulty
         self.max_depth = self.get_depth_for_difficulty(difficulty)
+        self.time_budget = time_budget if time_budget is not None else self.get_time_budget_for_difficulty(difficulty)
+        self.transposition_table = transposition_table if transposition_table is not None else TranspositionTable()
+        self.opening_book = opening_book
+        self.tablebase = tablebase
+        self.move_cache = move_cache  # Used for the root moves only; the search would flood it
+        self.batch_evaluator = batch_evaluator
+        self.collect_stats = collect_stats
+        self.node_limit = max_nodes if max_nodes is not None else float('inf')
+        self.stats = None  # SearchStats of the last move choice, with collect_stats
+        
+        # Search state
+        self.nodes = 0
+        self.cutoffs = 0
+        self.depth_reached = 0
+        self.principal_variation = []
+        self.iteration_results = []  # (depth, score, move) per completed iteration
+        self.best_score = None
+        self.move_source = None  # "search", "book", "tablebase" or "random"
+        self.deadline = None
+        self.root_ply = 0
+        self.pv_table = []
+        self.following_pv = False
+        self.move_ordering = True  # Switch off to search in generation order
+        self.random_moves = True  # Switch off so easy and medium always search
+        self.killers = []
+        self.history = {}
     
     def get_depth_for_difficulty(self, difficulty: str) -> int:
         """Get search depth based on difficulty level."""
@@ -23,100 +88,433 @@ class DraughtsAI:
         }
         return depths.get(difficulty, 6)
     
-    def get_best_move(self, engine: DraughtsEngine) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    def get_time_budget_for_difficulty(self, difficulty: str) -> float:
+        """Get the wall-clock budget in seconds for one AI move."""
+        budgets = {
+            "easy": 0.2,
+            "medium": 0.5,
+            "hard": 1.5,
+            "expert": 3.0
+        }
+        return budgets.get(difficulty, 1.5)
+    
+    def get_best_move(self, engine: DraughtsEngine, root_moves: Optional[list] = None) -> Optional[Tuple[Tuple[int, int], ...]]:
         """
-        Get the best move for the current player using Minimax with alpha-beta pruning.
+        Get the best move for the current player using iterative deepening:
+        search depth 1, 2, 3... up to max_depth until the time budget runs out
+        and play the best move of the last completed iteration. Each
+        iteration searches the previous principal variation first.
+        Pass root_moves to search only those moves at the root, as the
+        parallel root-split search does. Positions in the opening book or
+        the endgame tablebase are answered from them without searching.
         """
+        if not self.collect_stats:
+            return self.find_move(engine, root_moves)
+        
+        stats = SearchStats(self.difficulty)
+        tt = self.transposition_table
+        tt_probes, tt_hits = (tt.probes, tt.hits) if tt is not None else (0, 0)
+        
+        # Time move generation and evaluation through wrappers that exist
+        # only for this search
+        batch_evaluator = self.batch_evaluator
+        engine.get_all_valid_moves_for_player = timed(engine.get_all_valid_moves_for_player, stats.movegen)
+        engine.evaluate_board = timed(engine.evaluate_board, stats.evaluation)
+        if batch_evaluator is not None:
+            self.batch_evaluator = SimpleNamespace(evaluate=timed(batch_evaluator.evaluate, stats.evaluation))
+        start = time.perf_counter()
+        try:
+            best_move = self.find_move(engine, root_moves)
+        finally:
+            stats.seconds = time.perf_counter() - start
+            del engine.get_all_valid_moves_for_player
+            del engine.evaluate_board
+            self.batch_evaluator = batch_evaluator
+        
+        stats.source = self.move_source or "none"
+        if self.move_source == "search":
+            stats.nodes = self.nodes
+            stats.depth = self.depth_reached
+            stats.cutoffs = self.cutoffs
+            stats.score = self.best_score
+            stats.principal_variation = self.principal_variation
+        if tt is not None:
+            stats.tt_probes = tt.probes - tt_probes
+            stats.tt_hits = tt.hits - tt_hits
+        self.stats = stats
+        return best_move
+    
+    def find_move(self, engine: DraughtsEngine, root_moves: Optional[list] = None) -> Optional[Tuple[Tuple[int, int], ...]]:
+        """Choose the move as get_best_move describes, without collecting statistics."""
+        self.move_source = None
         player = engine.current_player
-        best_move = None
-        best_score = float('-inf')
-        alpha = float('-inf')
-        beta = float('inf')
         
         # Get all valid moves
-        valid_moves = engine.get_all_valid_moves_for_player(player)
+        if self.move_cache is not None:
+            valid_moves = list(self.move_cache.get_moves(engine))
+        else:
+            valid_moves = engine.get_all_valid_moves_for_player(player)
+        if root_moves is not None:
+            valid_moves = [move for move in valid_moves if move in root_moves]
         
         if not valid_moves:
             return None
         
+        if self.opening_book is not None and root_moves is None:
+            book_move = self.opening_book.choose_move(engine)
+            if book_move is not None:
+                self.move_source = "book"
+                return book_move
+        
+        if self.tablebase is not None and root_moves is None:
+            tablebase_move = self.tablebase_move(engine, valid_moves)
+            if tablebase_move is not None:
+                self.move_source = "tablebase"
+                return tablebase_move
+        
         # Add some randomness for lower difficulties
-        if self.difficulty == "easy":
-            # 30% chance to make a random move
-            if random.random() < 0.3:
-                return random.choice(valid_moves)
-        elif self.difficulty == "medium":
-            # 15% chance to make a random move
-            if random.random() < 0.15:
-                return random.choice(valid_moves)
-        
-        # Evaluate each move
-        for from_pos, to_pos in valid_moves:
-            # Make a copy of the engine to simulate the move
-            temp_engine = copy.deepcopy(engine)
-            temp_engine.make_move(from_pos, to_pos)
+        if self.random_moves and root_moves is None:
+            if self.difficulty == "easy":
+                # 30% chance to make a random move
+                if random.random() < 0.3:
+                    self.move_source = "random"
+                    return random.choice(valid_moves)
+            elif self.difficulty == "medium":
+                # 15% chance to make a random move
+                if random.random() < 0.15:
+                    self.move_source = "random"
+                    return random.choice(valid_moves)
+        
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+        
+        self.move_source = "search"
+        self.nodes = 0
+        self.cutoffs = 0
+        self.depth_reached = 0
+        self.principal_variation = []
+        self.iteration_results = []
+        self.root_ply = len(engine.undo_stack)
+        self.pv_table = [[] for _ in range(self.max_depth + 1)]
+        self.killers = [[] for _ in range(self.max_depth + 1)]
+        self.history = {}
+        start = time.perf_counter()
+        best_move = valid_moves[0]
+        
+        # The search bypasses the engine's shared legal-move cache, which it would flood
+        shared_cache = engine.move_cache
+        engine.move_cache = None
+        
+        for depth in range(1, self.max_depth + 1):
+            # The first iteration always completes so there is a move to play
+            self.deadline = start + self.time_budget if depth > 1 else None
+            try:
+                best_move = self.search_root(engine, valid_moves, depth, player)
+            except SearchTimeout:
+                # Unwind the moves the interrupted iteration left on the engine
+                while len(engine.undo_stack) > self.root_ply:
+                    engine.pop_move()
+                break
             
-            # Evaluate this move
-            score = self.minimax(temp_engine, self.max_depth - 1, alpha, beta, False, player)
+            self.depth_reached = depth
+            self.principal_variation = self.pv_table[0]
+            self.iteration_results.append((depth, self.best_score, best_move))
+            if time.perf_counter() - start >= self.time_budget or self.nodes >= self.node_limit:
+                break
+        
+        self.deadline = None
+        engine.move_cache = shared_cache
+        return best_move
+    
+    def search_root(self, engine: DraughtsEngine, valid_moves: list, depth: int, player: int):
+        """
+        Search every root move to a fixed depth and return the best one.
+        Equal scores go to the move generated first, whatever order the moves
+        are searched in, so move ordering never changes the chosen move.
+        """
+        best_move = None
+        best_index = None
+        best_score = float('-inf')
+        beta = float('inf')
+        self.pv_table[0] = []
+        
+        tt = self.transposition_table
+        hash_move = self.hash_move(tt.probe(engine.hash)) if tt is not None else None
+        pv_move = self.pv_move(0)
+        generation_index = {move: index for index, move in enumerate(valid_moves)}
+        ordered_moves = self.order_moves(engine, valid_moves, 0, pv_move, hash_move)
+        
+        # Evaluate each move, searching in place on the engine
+        for move in ordered_moves:
+            index = generation_index[move]
+            # A move generated before the current best also wins on an equal
+            # score, so its window must be wide enough to report one exactly
+            alpha = best_score
+            if best_index is not None and index < best_index:
+                alpha -= self.TIE_MARGIN
             
-            if score > best_score:
-                best_score = score
-                best_move = (from_pos, to_pos)
+            self.following_pv = pv_move == move
+            engine.push_move(move)
+            score = self.minimax(engine, depth - 1, alpha, beta, False, player)
+            engine.pop_move()
+            self.following_pv = False
             
-            alpha = max(alpha, best_score)
+            if best_move is None or score > best_score or (score == best_score and index < best_index):
+                best_score = score
+                best_move = move
+                best_index = index
+                self.pv_table[0] = [best_move] + self.pv_table[1]
+        
+        if tt is not None:
+            tt.store(engine.hash, depth, EXACT, best_score, best_move)
+        
+        self.best_score = best_score
         
         return best_move
     
+    def tablebase_move(self, engine: DraughtsEngine, valid_moves: list) -> Optional[Tuple[Tuple[int, int], ...]]:
+        """
+        Perfect move from the endgame tablebase: the fastest win, else a
+        draw, else the slowest loss. None if a reply is not in the tables.
+        """
+        best_move = None
+        best_score = None
+        for move in valid_moves:
+            engine.push_move(move)
+            probe = self.tablebase.probe(engine)
+            engine.pop_move()
+            if probe is None:
+                return None
+            score = -probe_score(*probe)
+            if best_score is None or score > best_score:
+                best_move, best_score = move, score
+        return best_move
+    
+    @staticmethod
+    def hash_move(entry) -> Optional[Tuple[Tuple[int, int], ...]]:
+        """Best move stored in a transposition table entry, if any."""
+        return entry.best_move if entry is not None else None
+    
+    def pv_move(self, ply: int) -> Optional[Tuple[Tuple[int, int], ...]]:
+        """Move the previous iteration's principal variation played at this ply."""
+        if ply < len(self.principal_variation):
+            return self.principal_variation[ply]
+        return None
+    
+    def order_moves(self, engine: DraughtsEngine, valid_moves: list, ply: int, pv_move, hash_move) -> list:
+        """
+        Order moves so alpha-beta cuts off early: the principal variation
+        move, then the hash move, then promotions, then this ply's killer
+        moves, then everything else by history score. Captures need no
+        priority of their own since they are compulsory: when there is one,
+        every generated move is a capture.
+        """
+        if not self.move_ordering or len(valid_moves) < 2:
+            return valid_moves
+        
+        player = engine.current_player
+        promotion_row = 0 if player == 1 else 7
+        killers = self.killers[ply]
+        history = self.history
+        
+        def priority(move):
+            from_pos, to_pos = move[0], move[-1]
+            if move == pv_move:
+                return self.PV_MOVE_SCORE
+            if move == hash_move:
+                return self.HASH_MOVE_SCORE
+            if to_pos[0] == promotion_row and not engine.is_king(engine.get_piece(*from_pos)):
+                return self.PROMOTION_SCORE
+            if move in killers:
+                return self.KILLER_MOVE_SCORE - killers.index(move)
+            return history.get((player, move), 0)
+        
+        return sorted(valid_moves, key=priority, reverse=True)
+    
+    def record_cutoff(self, engine: DraughtsEngine, ply: int, depth: int, move):
+        """Remember a quiet move that caused a cutoff as a killer and in the history table."""
+        self.cutoffs += 1
+        from_pos, to_pos = move[0], move[1]
+        if abs(to_pos[0] - from_pos[0]) != 1:
+            return
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        key = (engine.current_player, move)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+    
     def minimax(self, engine: DraughtsEngine, depth: int, alpha: float, beta: float, 
                 is_maximizing: bool, original_player: int) -> float:
         """
         Minimax algorithm with alpha-beta pruning.
+        Scores are from original_player's point of view; the transposition
+        table keeps them from the side to move's, hence the sign flips.
         """
-        # Check if game is over
-        is_over, winner = engine.is_game_over()
-        if is_over:
-            if winner == original_player:
-                return 1000  # Win
-            elif winner is None:
-                return 0  # Draw
-            else:
-                return -1000  # Loss
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % self.TIME_CHECK_INTERVAL == 0:
+            if time.perf_counter() >= self.deadline or self.nodes >= self.node_limit:
+                raise SearchTimeout()
+        
+        ply = len(engine.undo_stack) - self.root_ply
+        self.pv_table[ply] = []
+        following_pv = self.following_pv
+        self.following_pv = False
+        
+        tt = self.transposition_table
+        entry = None
+        alpha_orig, beta_orig = alpha, beta
+        sign = 1 if is_maximizing else -1
+        
+        if tt is not None:
+            entry = tt.probe(engine.hash)
+            if entry is not None and entry.depth >= depth:
+                score = entry.score * sign
+                flag = entry.flag if is_maximizing else self.flip_bound(entry.flag)
+                if flag == EXACT:
+                    return score
+                if flag == LOWER_BOUND:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if beta <= alpha:
+                    return score
+        
+        end_score = self.end_score(engine, original_player)
+        if end_score is not None:
+            return end_score
         
         # Check depth limit
         if depth == 0:
             return engine.evaluate_board(original_player)
         
+        valid_moves = engine.get_all_valid_moves_for_player(engine.current_player)
+        pv_move = self.pv_move(ply) if following_pv else None
+        valid_moves = self.order_moves(engine, valid_moves, ply, pv_move, self.hash_move(entry))
+        best_move = None
+        leaf_scores = None
+        if depth == 1 and self.batch_evaluator is not None:
+            leaf_scores = self.evaluate_leaves(engine, valid_moves, original_player)
+            self.pv_table[ply + 1] = []
+        
         if is_maximizing:
             max_eval = float('-inf')
-            valid_moves = engine.get_all_valid_moves_for_player(engine.current_player)
             
-            for from_pos, to_pos in valid_moves:
-                temp_engine = copy.deepcopy(engine)
-                temp_engine.make_move(from_pos, to_pos)
-                
-                eval_score = self.minimax(temp_engine, depth - 1, alpha, beta, False, original_player)
-                max_eval = max(max_eval, eval_score)
+            for index, move in enumerate(valid_moves):
+                if leaf_scores is not None:
+                    eval_score = leaf_scores[index]
+                else:
+                    self.following_pv = pv_move == move
+                    engine.push_move(move)
+                    eval_score = self.minimax(engine, depth - 1, alpha, beta, False, original_player)
+                    engine.pop_move()
+                if eval_score > max_eval:
+                    max_eval = eval_score
+                    best_move = move
+                    if eval_score > alpha:
+                        self.pv_table[ply] = [best_move] + self.pv_table[ply + 1]
                 alpha = max(alpha, eval_score)
                 
                 if beta <= alpha:
+                    self.record_cutoff(engine, ply, depth, move)
                     break  # Beta cutoff
             
-            return max_eval
+            best_eval = max_eval
         else:
             min_eval = float('inf')
-            valid_moves = engine.get_all_valid_moves_for_player(engine.current_player)
             
-            for from_pos, to_pos in valid_moves:
-                temp_engine = copy.deepcopy(engine)
-                temp_engine.make_move(from_pos, to_pos)
-                
-                eval_score = self.minimax(temp_engine, depth - 1, alpha, beta, True, original_player)
-                min_eval = min(min_eval, eval_score)
+            for index, move in enumerate(valid_moves):
+                if leaf_scores is not None:
+                    eval_score = leaf_scores[index]
+                else:
+                    self.following_pv = pv_move == move
+                    engine.push_move(move)
+                    eval_score = self.minimax(engine, depth - 1, alpha, beta, True, original_player)
+                    engine.pop_move()
+                if eval_score < min_eval:
+                    min_eval = eval_score
+                    best_move = move
+                    if eval_score < beta:
+                        self.pv_table[ply] = [best_move] + self.pv_table[ply + 1]
                 beta = min(beta, eval_score)
                 
                 if beta <= alpha:
+                    self.record_cutoff(engine, ply, depth, move)
                     break  # Alpha cutoff
             
-            return min_eval
+            best_eval = min_eval
+        
+        if tt is not None:
+            if best_eval <= alpha_orig:
+                flag = UPPER_BOUND
+            elif best_eval >= beta_orig:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            if not is_maximizing:
+                flag = self.flip_bound(flag)
+            tt.store(engine.hash, depth, flag, best_eval * sign, best_move)
+        
+        return best_eval
+    
+    def end_score(self, engine: DraughtsEngine, original_player: int) -> Optional[float]:
+        """Score of a position whose result is known, or None to search on."""
+        # Exact result from the endgame tablebase, nearer wins scoring higher
+        if self.tablebase is not None:
+            probe = self.tablebase.probe(engine)
+            if probe is not None:
+                score = probe_score(*probe)
+                return score if engine.current_player == original_player else -score
+        
+        # Check if game is over
+        is_over, winner = engine.is_game_over()
+        if is_over:
+            if winner == original_player:
+                return 1000  # Win
+            elif winner is None:
+                return 0  # Draw
+            else:
+                return -1000  # Loss
+        return None
+    
+    def evaluate_leaves(self, engine: DraughtsEngine, valid_moves: list, original_player: int) -> list:
+        """
+        Scores of every child of a node one ply above the leaves. Children
+        with a known result are scored as minimax would; the rest are
+        evaluated together by the batch evaluator. Leaves are not looked up
+        in the transposition table.
+        """
+        scores = [None] * len(valid_moves)
+        positions = []
+        indices = []
+        for index, move in enumerate(valid_moves):
+            engine.push_move(move)
+            score = self.end_score(engine, original_player)
+            if score is None:
+                positions.append(encode_board(engine.board))
+                indices.append(index)
+            else:
+                scores[index] = score
+            engine.pop_move()
+        self.nodes += len(valid_moves)
+        
+        if positions:
+            evaluated = self.batch_evaluator.evaluate(positions, original_player).tolist()
+            for index, score in zip(indices, evaluated):
+                scores[index] = score
+        
+        if self.deadline is not None and (time.perf_counter() >= self.deadline or self.nodes >= self.node_limit):
+            raise SearchTimeout()
+        return scores
+    
+    @staticmethod
+    def flip_bound(flag: int) -> int:
+        """Turn a bound into the opponent's point of view."""
+        if flag == LOWER_BOUND:
+            return UPPER_BOUND
+        if flag == UPPER_BOUND:
+            return LOWER_BOUND
+        return flag
     
     def make_move(self, engine: DraughtsEngine) -> bool:
         """
@@ -128,5 +526,4 @@ class DraughtsAI:
         if best_move is None:
             return False
         
-        from_pos, to_pos = best_move
-        return engine.make_move(from_pos, to_pos)
+        return engine.make_move(best_move[0], best_move[-1], list(best_move[1:-1]))
@@ -1,5 +1,86 @@
 from typing import List, Tuple, Optional
 import copy
+import random
+
+
+# Zobrist keys: one 64-bit key per piece type per square, plus one that is
+# xored in while player 2 is to move. Seeded so hashes are stable across
+# processes and restarts.
+_zobrist_rng = random.Random(0x5EED)
+ZOBRIST_PIECES = {
+    piece: [[_zobrist_rng.getrandbits(64) for _ in range(8)] for _ in range(8)]
+    for piece in (1, 2, -1, -2)
+}
+ZOBRIST_PLAYER2 = _zobrist_rng.getrandbits(64)
+
+# Compact position encoding. The 32 playable squares are numbered 1-32 row
+# by row from player 2's back row, as in PDN. A position is written
+# "<side to move>:W<squares>:B<squares>", with W for player 1, B for
+# player 2 and a K before each king's square, e.g. the start is
+# "W:W21,...,32:B1,...,12". The packed form is 16 bytes, one nibble per
+# square (0 empty, then 1, 2, -1, -2 as PIECE_CODES), with bit 3 of the
+# first nibble set when player 2 is to move.
+SQUARES = [(sq // 4, (sq % 4) * 2 + (1 - (sq // 4) % 2)) for sq in range(32)]
+SQUARE_NUMBERS = {square: number for number, square in enumerate(SQUARES, 1)}
+PIECE_CODES = {0: 0, 1: 1, 2: 2, -1: 3, -2: 4}
+CODE_PIECES = {code: piece for piece, code in PIECE_CODES.items()}
+FEN_COLOURS = {1: "W", 2: "B"}
+FEN_PLAYERS = {"W": 1, "B": 2}
+
+
+def format_fen(board: List[List[int]], current_player: int) -> str:
+    """Write a position in the compact FEN-style encoding."""
+    sections = [FEN_COLOURS[current_player]]
+    for player in (1, 2):
+        squares = []
+        for number, (row, col) in enumerate(SQUARES, 1):
+            piece = board[row][col]
+            if abs(piece) == player:
+                squares.append(f"K{number}" if piece < 0 else str(number))
+        sections.append(FEN_COLOURS[player] + ",".join(squares))
+    return ":".join(sections)
+
+
+def parse_fen(fen: str) -> Tuple[List[List[int]], int]:
+    """Read (board, current_player) from the compact FEN-style encoding."""
+    sections = fen.strip().rstrip(".").split(":")
+    if len(sections) != 3 or sections[0] not in FEN_PLAYERS:
+        raise ValueError(f"Invalid position: {fen!r}")
+    board = [[0 for _ in range(8)] for _ in range(8)]
+    for section in sections[1:]:
+        player = FEN_PLAYERS.get(section[:1])
+        if player is None:
+            raise ValueError(f"Invalid position: {fen!r}")
+        for square in filter(None, section[1:].split(",")):
+            king = square.startswith("K")
+            number = int(square[1:] if king else square)
+            if not 1 <= number <= 32:
+                raise ValueError(f"Invalid square {number} in {fen!r}")
+            row, col = SQUARES[number - 1]
+            board[row][col] = -player if king else player
+    return board, FEN_PLAYERS[sections[0]]
+
+
+def compact_board_state(state: dict) -> dict:
+    """Board state in the compact form, whichever form it is in."""
+    if "position" in state:
+        return state
+    return {
+        "position": format_fen(state["board"], state.get("current_player", 1)),
+        "move_count": state.get("move_count", 0)
+    }
+
+
+def expand_board_state(state: Optional[dict]) -> Optional[dict]:
+    """Board state with the full 8x8 board, whichever form it is in."""
+    if not state or "position" not in state:
+        return state
+    board, current_player = parse_fen(state["position"])
+    return {
+        "board": board,
+        "current_player": current_player,
+        "move_count": state.get("move_count", 0)
+    }
 
 
 class DraughtsEngine:
@@ -12,7 +93,12 @@ class DraughtsEngine:
         self.board = self.initialize_board()
         self.current_player = 1  # 1 = Player 1 (bottom), 2 = Player 2 (top)
         self.move_history = []
-        
+        self.undo_stack = []  # Undo records for push_move / pop_move
+        self.hash = self.compute_hash()  # Zobrist hash, kept up to date by moves
+        self.count_material()  # Evaluation terms, kept up to date by moves
+        self.tablebase = None  # Endgame tablebase that decides is_game_over, if set
+        self.move_cache = None  # Shared LegalMoveCache for make_move and is_game_over, if set
+    
     def initialize_board(self) -> List[List[int]]:
         """
         Initialize standard 8x8 draughts board.
@@ -35,8 +121,17 @@ class DraughtsEngine:
         
         return board
     
-    def get_board_state(self) -> dict:
-        """Get current board state as dictionary."""
+    def get_board_state(self, compact: bool = False) -> dict:
+        """
+        Get current board state as dictionary.
+        With compact=True the position is a FEN-style string instead of
+        the 8x8 board and side to move.
+        """
+        if compact:
+            return {
+                "position": self.to_fen(),
+                "move_count": len(self.move_history)
+            }
         return {
             "board": self.board,
             "current_player": self.current_player,
@@ -44,10 +139,84 @@ class DraughtsEngine:
         }
     
     def set_board_state(self, state: dict):
-        """Set board state from dictionary."""
-        self.board = state.get("board", self.initialize_board())
-        self.current_player = state.get("current_player", 1)
+        """Set board state from dictionary, in either form get_board_state returns."""
+        if "position" in state:
+            self.board, self.current_player = parse_fen(state["position"])
+        else:
+            self.board = state.get("board", self.initialize_board())
+            self.current_player = state.get("current_player", 1)
         self.move_history = state.get("move_history", [])
+        self.undo_stack = []
+        self.hash = self.compute_hash()
+        self.count_material()
+    
+    def to_fen(self) -> str:
+        """Encode the position as a FEN-style string."""
+        return format_fen(self.board, self.current_player)
+    
+    def set_fen(self, fen: str):
+        """Set the position from a FEN-style string."""
+        self.set_board_state({"position": fen})
+    
+    def pack_position(self) -> bytes:
+        """Encode the position in 16 bytes, one nibble per playable square."""
+        codes = [PIECE_CODES[self.board[row][col]] for row, col in SQUARES]
+        if self.current_player == 2:
+            codes[0] |= 8
+        return bytes(codes[i] << 4 | codes[i + 1] for i in range(0, 32, 2))
+    
+    def unpack_position(self, data: bytes):
+        """Set the position from its 16-byte packed form."""
+        if len(data) != 16:
+            raise ValueError("A packed position is 16 bytes")
+        codes = []
+        for byte in data:
+            codes.extend((byte >> 4, byte & 15))
+        board = [[0 for _ in range(8)] for _ in range(8)]
+        for (row, col), code in zip(SQUARES, codes):
+            board[row][col] = CODE_PIECES[code & 7]
+        self.set_board_state({"board": board, "current_player": 2 if codes[0] & 8 else 1})
+    
+    def compute_hash(self) -> int:
+        """Compute the Zobrist hash of the position from scratch."""
+        h = ZOBRIST_PLAYER2 if self.current_player == 2 else 0
+        for row in range(8):
+            for col in range(8):
+                piece = self.board[row][col]
+                if piece != 0:
+                    h ^= ZOBRIST_PIECES[piece][row][col]
+        return h
+    
+    @staticmethod
+    def advancement(piece: int, row: int) -> int:
+        """Rows a man has advanced from its own back row."""
+        return 7 - row if piece == 1 else row
+    
+    def count_material(self):
+        """
+        Count men, kings and advancement per player from scratch.
+        Moves keep these counts up to date, so evaluate_board never scans
+        the board. Also indexes the squares each player's pieces stand on.
+        """
+        self.piece_squares, self.men_count, self.king_count, self.advancement_sum = self.scan_material()
+    
+    def scan_material(self) -> tuple:
+        """(piece squares, men, kings, advancement) per player, from a full board scan."""
+        piece_squares = [None, set(), set()]
+        men_count = [0, 0, 0]
+        king_count = [0, 0, 0]
+        advancement_sum = [0, 0, 0]
+        for row in range(8):
+            for col in range(8):
+                piece = self.board[row][col]
+                if piece != 0:
+                    piece_squares[abs(piece)].add((row, col))
+                if piece < 0:
+                    king_count[-piece] += 1
+                elif piece > 0:
+                    men_count[piece] += 1
+                    advancement_sum[piece] += self.advancement(piece, row)
+        return piece_squares, men_count, king_count, advancement_sum
     
     def is_valid_position(self, row: int, col: int) -> bool:
         """Check if position is within board bounds."""
@@ -64,27 +233,68 @@ class DraughtsEngine:
         return piece < 0
     
     def get_player_pieces(self, player: int) -> List[Tuple[int, int]]:
-        """Get all pieces for a player."""
-        pieces = []
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece == player or piece == -player:
-                    pieces.append((row, col))
-        return pieces
+        """Get all pieces for a player, in board order."""
+        return sorted(self.piece_squares[player])
+    
+    def has_jump(self, row: int, col: int) -> bool:
+        """Check if a piece can start a capture, without building the chains."""
+        piece = self.board[row][col]
+        for dr, dc in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
+            landing_row, landing_col = row + 2*dr, col + 2*dc
+            if not self.is_valid_position(landing_row, landing_col):
+                continue
+            middle_piece = self.board[row + dr][col + dc]
+            if middle_piece != 0 and abs(middle_piece) != abs(piece) and self.board[landing_row][landing_col] == 0:
+                return True
+        return False
+    
+    def has_step(self, row: int, col: int) -> bool:
+        """Check if a piece has a simple move."""
+        piece = self.board[row][col]
+        if piece == 1:
+            directions = [(-1, -1), (-1, 1)]
+        elif piece == 2:
+            directions = [(1, -1), (1, 1)]
+        else:
+            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        for dr, dc in directions:
+            new_row, new_col = row + dr, col + dc
+            if self.is_valid_position(new_row, new_col) and self.board[new_row][new_col] == 0:
+                return True
+        return False
+    
+    def has_moves(self, player: int) -> bool:
+        """Check if a player has any legal move at all."""
+        return any(self.has_jump(row, col) or self.has_step(row, col) for row, col in self.piece_squares[player])
     
     def get_valid_moves(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get all valid moves for a piece at given position."""
+        """
+        Get all valid destinations for a piece at given position.
+        A capture chain's destination is the square it ends on.
+        """
+        return list(dict.fromkeys(move[-1] for move in self.get_piece_moves(row, col)))
+    
+    def get_piece_moves(self, row: int, col: int) -> List[Tuple[Tuple[int, int], ...]]:
+        """
+        Get all valid moves for a piece at given position, as paths: the
+        piece's square, then every square it lands on.
+        """
         piece = self.get_piece(row, col)
         if piece == 0 or abs(piece) != self.current_player:
             return []
         
-        moves = []
-        captures = self.get_capture_moves(row, col)
+        captures = self.get_capture_sequences(row, col)
         
         if captures:
             return captures
         
+        return self.get_step_moves(row, col)
+    
+    def get_step_moves(self, row: int, col: int) -> List[Tuple[Tuple[int, int], ...]]:
+        """Get the simple (non-capture) moves of a piece."""
+        piece = self.board[row][col]
+        moves = []
+        
         # Normal moves
         directions = []
         if piece == 1:  # Player 1 regular piece
@@ -97,57 +307,84 @@ class DraughtsEngine:
         for dr, dc in directions:
             new_row, new_col = row + dr, col + dc
             if self.is_valid_position(new_row, new_col) and self.board[new_row][new_col] == 0:
-                moves.append((new_row, new_col))
+                moves.append(((row, col), (new_row, new_col)))
         
         return moves
     
     def get_capture_moves(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get all capture moves for a piece."""
+        """Get the squares a piece's capture chains end on."""
+        return list(dict.fromkeys(path[-1] for path in self.get_capture_sequences(row, col)))
+    
+    def get_capture_sequences(self, row: int, col: int) -> List[Tuple[Tuple[int, int], ...]]:
+        """
+        Get every complete capture chain for a piece, as paths.
+        A piece that has jumped must keep jumping while it can. Captured
+        pieces stay on the board until the move ends, so none is jumped
+        twice, and a man that reaches the last row is crowned and stops.
+        """
         piece = self.get_piece(row, col)
-        if piece == 0:
+        if not piece:
             return []
         
-        captures = []
-        directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        
-        # Regular pieces can only move in certain directions for captures
-        if piece == 1:
-            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        elif piece == 2:
-            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        sequences = []
+        self._extend_captures(piece, [(row, col)], set(), sequences)
+        return sequences
+    
+    def _extend_captures(self, piece: int, path: list, captured: set, sequences: list):
+        """Depth-first search for the capture chains continuing a path."""
+        row, col = path[-1]
+        extended = False
         
-        for dr, dc in directions:
+        # Men capture in all four directions too
+        for dr, dc in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
             middle_row, middle_col = row + dr, col + dc
             landing_row, landing_col = row + 2*dr, col + 2*dc
             
-            if not self.is_valid_position(middle_row, middle_col):
-                continue
             if not self.is_valid_position(landing_row, landing_col):
                 continue
+            if (middle_row, middle_col) in captured:
+                continue
             
             middle_piece = self.board[middle_row][middle_col]
             landing_piece = self.board[landing_row][landing_col]
             
-            # Check if we can capture
-            if middle_piece != 0 and abs(middle_piece) != abs(piece):
-                if landing_piece == 0:
-                    captures.append((landing_row, landing_col))
-        
-        return captures
+            # The jumping piece has left its starting square
+            if landing_piece != 0 and (landing_row, landing_col) != path[0]:
+                continue
+            if middle_piece == 0 or abs(middle_piece) == abs(piece):
+                continue
+            
+            extended = True
+            path.append((landing_row, landing_col))
+            captured.add((middle_row, middle_col))
+            if not self.is_king(piece) and landing_row == (0 if piece == 1 else 7):
+                sequences.append(tuple(path))
+            else:
+                self._extend_captures(piece, path, captured, sequences)
+            captured.remove((middle_row, middle_col))
+            path.pop()
+        
+        if not extended and len(path) > 1:
+            sequences.append(tuple(path))
     
     def must_capture(self) -> bool:
         """Check if current player must make a capture."""
-        pieces = self.get_player_pieces(self.current_player)
-        for row, col in pieces:
-            if self.get_capture_moves(row, col):
-                return True
-        return False
+        return any(self.has_jump(row, col) for row, col in self.piece_squares[self.current_player])
     
-    def make_move(self, from_pos: Tuple[int, int], to_pos: Tuple[int, int]) -> bool:
+    def make_move(
+        self,
+        from_pos: Tuple[int, int],
+        to_pos: Tuple[int, int],
+        path: Optional[List[Tuple[int, int]]] = None
+    ) -> bool:
         """
         Make a move on the board.
+        A capture chain is made in one call: to_pos is the square it ends
+        on, and path lists the squares landed on in between. path is only
+        needed when two chains end on the same square.
         Returns True if move was successful, False otherwise.
         """
+        from_pos, to_pos = tuple(from_pos), tuple(to_pos)
         from_row, from_col = from_pos
         to_row, to_col = to_pos
         
@@ -163,46 +400,135 @@ class DraughtsEngine:
         if abs(piece) != self.current_player:
             return False
         
-        # Check if destination is empty
-        if self.board[to_row][to_col] != 0:
-            return False
-        
         # Check if move is valid
-        valid_moves = self.get_valid_moves(from_row, from_col)
-        if to_pos not in valid_moves:
+        if self.move_cache is not None:
+            captures, steps = self.move_cache.lookup(self)
+            piece_moves = [move for move in captures if move[0] == from_pos]
+            piece_moves = piece_moves or [move for move in steps if move[0] == from_pos]
+        else:
+            piece_moves = self.get_piece_moves(from_row, from_col)
+        moves = [move for move in piece_moves if move[-1] == to_pos]
+        if path is not None:
+            moves = [move for move in moves if list(move[1:-1]) == [tuple(pos) for pos in path]]
+        if len(moves) != 1:
             return False
         
+        self._apply_move(moves[0])
+        
+        return True
+    
+    def _apply_move(self, move: Tuple[Tuple[int, int], ...]) -> dict:
+        """
+        Apply an already validated move and return its undo record.
+        """
+        from_pos, to_pos = move[0], move[-1]
+        from_row, from_col = from_pos
+        to_row, to_col = to_pos
+        piece = self.board[from_row][from_col]
+        player = abs(piece)
+        previous_hash = self.hash
+        previous_material = (self.men_count[:], self.king_count[:], self.advancement_sum[:])
+        
         # Check if this is a capture move
-        is_capture = abs(to_row - from_row) == 2
+        is_capture = abs(move[1][0] - from_row) == 2
+        captured = []
         
         if is_capture:
-            # Remove captured piece
-            middle_row = (from_row + to_row) // 2
-            middle_col = (from_col + to_col) // 2
-            self.board[middle_row][middle_col] = 0
+            # Remove the piece jumped on every hop
+            for (hop_row, hop_col), (land_row, land_col) in zip(move, move[1:]):
+                middle_row = (hop_row + land_row) // 2
+                middle_col = (hop_col + land_col) // 2
+                captured_piece = self.board[middle_row][middle_col]
+                captured.append(((middle_row, middle_col), captured_piece))
+                self.hash ^= ZOBRIST_PIECES[captured_piece][middle_row][middle_col]
+                self.board[middle_row][middle_col] = 0
+                self.piece_squares[abs(captured_piece)].discard((middle_row, middle_col))
+                if captured_piece < 0:
+                    self.king_count[-captured_piece] -= 1
+                else:
+                    self.men_count[captured_piece] -= 1
+                    self.advancement_sum[captured_piece] -= self.advancement(captured_piece, middle_row)
         
         # Move the piece
-        self.board[to_row][to_col] = piece
         self.board[from_row][from_col] = 0
+        self.board[to_row][to_col] = piece
+        self.piece_squares[player].discard(from_pos)
+        self.piece_squares[player].add(to_pos)
+        
+        if piece > 0:
+            self.advancement_sum[player] += self.advancement(piece, to_row) - self.advancement(piece, from_row)
         
         # Check for king promotion
+        promoted = False
         if piece == 1 and to_row == 0:
             self.board[to_row][to_col] = -1
+            promoted = True
         elif piece == 2 and to_row == 7:
             self.board[to_row][to_col] = -2
+            promoted = True
+        
+        if promoted:
+            self.men_count[player] -= 1
+            self.king_count[player] += 1
+            self.advancement_sum[player] -= self.advancement(piece, to_row)
+        
+        self.hash ^= ZOBRIST_PIECES[piece][from_row][from_col]
+        self.hash ^= ZOBRIST_PIECES[self.board[to_row][to_col]][to_row][to_col]
+        self.hash ^= ZOBRIST_PLAYER2
         
         # Record move
         self.move_history.append({
             "from": from_pos,
             "to": to_pos,
             "player": self.current_player,
-            "capture": is_capture
+            "capture": is_capture,
+            "path": list(move[1:-1]),
+            "captured": [pos for pos, _ in captured]
         })
         
+        undo = {
+            "from": from_pos,
+            "to": to_pos,
+            "piece": piece,
+            "captured": captured,
+            "promoted": promoted,
+            "previous_player": self.current_player,
+            "previous_hash": previous_hash,
+            "previous_material": previous_material
+        }
+        
         # Switch player
         self.current_player = 3 - self.current_player
         
-        return True
+        return undo
+    
+    def push_move(self, move: Tuple[Tuple[int, int], ...]):
+        """
+        Make a move that can be taken back with pop_move.
+        The move must come from get_all_valid_moves_for_player; it is not
+        validated again. Used by the AI to search in place without copying.
+        """
+        self.undo_stack.append(self._apply_move(move))
+    
+    def pop_move(self):
+        """Take back the last move made with push_move."""
+        undo = self.undo_stack.pop()
+        from_row, from_col = undo["from"]
+        to_row, to_col = undo["to"]
+        
+        self.board[to_row][to_col] = 0
+        self.board[from_row][from_col] = undo["piece"]
+        player_squares = self.piece_squares[abs(undo["piece"])]
+        player_squares.discard(undo["to"])
+        player_squares.add(undo["from"])
+        for (row, col), piece in undo["captured"]:
+            self.board[row][col] = piece
+            self.piece_squares[abs(piece)].add((row, col))
+        
+        self.move_history.pop()
+        self.current_player = undo["previous_player"]
+        self.hash = undo["previous_hash"]
+        self.men_count, self.king_count, self.advancement_sum = undo["previous_material"]
     
     def is_game_over(self) -> Tuple[bool, Optional[int]]:
         """
@@ -210,65 +536,82 @@ class DraughtsEngine:
         Returns (is_over, winner) where winner is None for draw.
         """
         # Check if current player has any pieces
-        player1_pieces = self.get_player_pieces(1)
-        player2_pieces = self.get_player_pieces(2)
-        
-        if not player1_pieces:
+        if not self.piece_squares[1]:
             return (True, 2)
-        if not player2_pieces:
+        if not self.piece_squares[2]:
             return (True, 1)
         
         # Check if current player has any valid moves
-        has_moves = False
-        for row, col in self.get_player_pieces(self.current_player):
-            if self.get_valid_moves(row, col):
-                has_moves = True
-                break
-        
+        if self.move_cache is not None:
+            has_moves = any(self.move_cache.lookup(self))
+        else:
+            has_moves = self.has_moves(self.current_player)
         if not has_moves:
             return (True, 3 - self.current_player)
         
+        # Positions in the endgame tablebase are decided by perfect play
+        if self.tablebase is not None:
+            probe = self.tablebase.probe(self)
+            if probe is not None:
+                result, _ = probe
+                if result == 0:
+                    return (True, None)
+                return (True, self.current_player if result > 0 else 3 - self.current_player)
+        
         return (False, None)
     
     def evaluate_board(self, player: int) -> float:
         """
         Evaluate board position for a player.
         Used by AI to determine best move.
+        Men are worth 3 plus 0.1 per row advanced (own men only), kings 5.
+        Reads the incrementally kept counts, so it costs the same on any board.
         """
-        score = 0
-        
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece == 0:
-                    continue
-                
-                piece_value = 0
-                if abs(piece) == player:
-                    # Our piece
-                    if self.is_king(piece):
-                        piece_value = 5
-                    else:
-                        piece_value = 3
-                        # Bonus for pieces closer to promotion
-                        if player == 1:
-                            piece_value += (7 - row) * 0.1
-                        else:
-                            piece_value += row * 0.1
-                    
-                    score += piece_value
-                else:
-                    # Opponent piece
-                    if self.is_king(piece):
-                        piece_value = 5
-                    else:
-                        piece_value = 3
-                    
-                    score -= piece_value
-        
-        return score
+        opponent = 3 - player
+        score = (self.men_count[player] - self.men_count[opponent]) * 3
+        score += (self.king_count[player] - self.king_count[opponent]) * 5
+        return score + self.advancement_sum[player] * 0.1
+    
+    def evaluation_terms(self, player: int, recompute: bool = False) -> dict:
+        """
+        Break evaluate_board down into its terms for a player.
+        With recompute=True the terms come from a full board scan instead
+        of the incremental counts, so the two can be compared.
+        """
+        if recompute:
+            _, men, kings, advancement = self.scan_material()
+        else:
+            men, kings, advancement = self.men_count, self.king_count, self.advancement_sum
+        
+        opponent = 3 - player
+        terms = {
+            "men": (men[player] - men[opponent]) * 3,
+            "kings": (kings[player] - kings[opponent]) * 5,
+            "advancement": advancement[player] * 0.1
+        }
+        terms["total"] = terms["men"] + terms["kings"] + terms["advancement"]
+        return terms
+    
+    def generate_side_moves(self) -> Tuple[list, list]:
+        """
+        Generate (capture chains, simple moves) for every piece of the side
+        to move. Both are kept because make_move lets a piece without a
+        capture step even when another piece could capture.
+        """
+        captures = []
+        steps = []
+        for row, col in self.get_player_pieces(self.current_player):
+            captures.extend(self.get_capture_sequences(row, col))
+            steps.extend(self.get_step_moves(row, col))
+        return captures, steps
+    
+    def get_legal_moves(self) -> List[Tuple[Tuple[int, int], ...]]:
+        """Moves for the side to move, through the legal-move cache if one is set."""
+        if self.move_cache is not None:
+            return list(self.move_cache.get_moves(self))
+        return self.get_all_valid_moves_for_player(self.current_player)
     
-    def get_all_valid_moves_for_player(self, player: int) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    def get_all_valid_moves_for_player(self, player: int) -> List[Tuple[Tuple[int, int], ...]]:
         """Get all valid moves for a player."""
         all_moves = []
         pieces = self.get_player_pieces(player)
@@ -276,17 +619,13 @@ class DraughtsEngine:
         # Check if any captures are available
         captures = []
         for from_pos in pieces:
-            capture_moves = self.get_capture_moves(from_pos[0], from_pos[1])
-            for to_pos in capture_moves:
-                captures.append((from_pos, to_pos))
+            captures.extend(self.get_capture_sequences(from_pos[0], from_pos[1]))
         
         if captures:
             return captures
         
         # No captures, return all normal moves
         for from_pos in pieces:
-            moves = self.get_valid_moves(from_pos[0], from_pos[1])
-            for to_pos in moves:
-                all_moves.append((from_pos, to_pos))
+            all_moves.extend(self.get_piece_moves(from_pos[0], from_pos[1]))
         
         return all_moves
@@ -0,0 +1,339 @@
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from itertools import combinations
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from app.games.bitboard_engine import BitboardEngine, POS_TO_SQUARE, PROMOTION_ROW, _squares
+
+
+# Probe results, from the side to move's point of view
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+# Material signature: (player 1 men, player 1 kings, player 2 men, player 2 kings)
+Signature = Tuple[int, int, int, int]
+
+# Tablebase file: a header (magic, table count), a directory of
+# (signature, data offset, data length in bytes) entries, then one
+# little-endian 16-bit value per indexed position for each table:
+#   0 = draw (or an index that is not a legal position)
+#   1-32767 = side to move wins in that many plies
+#   32768-65535 = side to move loses in (value - 32768) plies
+MAGIC = b"DTB3"  # Bumped whenever the rules or the format change
+HEADER = struct.Struct("<4sI")
+DIRECTORY_ENTRY = struct.Struct("<4BII")
+MAX_DISTANCE = 32767
+LOSS_BASE = 32768
+
+# Table values in memory, in the byte order of this machine
+Table = Sequence[int]
+
+BINOMIAL = [[0] * 33 for _ in range(33)]
+for _n in range(33):
+    BINOMIAL[_n][0] = 1
+    for _k in range(1, _n + 1):
+        BINOMIAL[_n][_k] = BINOMIAL[_n - 1][_k - 1] + BINOMIAL[_n - 1][_k]
+
+
+def _rank(squares: List[int]) -> int:
+    """Combinatorial number of a sorted square set."""
+    return sum(BINOMIAL[sq][i + 1] for i, sq in enumerate(squares))
+
+
+def table_size(signature: Signature) -> int:
+    """Number of index slots in a table, for both sides to move."""
+    size = 2
+    for count in signature:
+        size *= BINOMIAL[32][count]
+    return size
+
+
+def position_index(signature: Signature, men1: int, kings1: int, men2: int, kings2: int, player: int) -> int:
+    """Index of a position within its material signature's table."""
+    index = 0
+    for count, bb in zip(signature, (men1, kings1, men2, kings2)):
+        index = index * BINOMIAL[32][count] + _rank(_squares(bb))
+    return index * 2 + player - 1
+
+
+def _split(player1: int, player2: int, kings: int) -> Tuple[int, int, int, int]:
+    return player1 & ~kings, player1 & kings, player2 & ~kings, player2 & kings
+
+
+def _signature_of(men1: int, kings1: int, men2: int, kings2: int) -> Signature:
+    return men1.bit_count(), kings1.bit_count(), men2.bit_count(), kings2.bit_count()
+
+
+def _encode(result: int, distance: int) -> int:
+    if distance > MAX_DISTANCE:
+        raise ValueError(f"Distance {distance} does not fit the table format")
+    return distance if result == WIN else LOSS_BASE + distance
+
+
+def _decode(value: int) -> Tuple[int, int]:
+    if value == 0:
+        return DRAW, 0
+    if value < LOSS_BASE:
+        return WIN, value
+    return LOSS, value - LOSS_BASE
+
+
+def probe_score(result: int, distance: int) -> float:
+    """
+    Search score of a probe for the side to move: wins nearer the end score
+    higher, all of them between any evaluation (500) and a won game (1000).
+    """
+    return result * (1000 - 500 * distance / (MAX_DISTANCE + 1))
+
+
+def _bitboards(engine) -> Tuple[int, int, int]:
+    """(player 1, player 2, kings) bitboards of either engine's position."""
+    if isinstance(engine, BitboardEngine):
+        return engine.pieces[1], engine.pieces[2], engine.kings
+    bitboards = [0, 0, 0]
+    kings = 0
+    for player in (1, 2):
+        for row, col in engine.piece_squares[player]:
+            bit = 1 << POS_TO_SQUARE[(row, col)]
+            bitboards[player] |= bit
+            if engine.board[row][col] < 0:
+                kings |= bit
+    return bitboards[1], bitboards[2], kings
+
+
+class Tablebase:
+    """
+    Win/draw/loss tables with distance to the end of the game, by material
+    signature. Each table holds one value per index slot, so probing a
+    position is a single lookup.
+    """
+    
+    def __init__(self, tables: Dict[Signature, Table]):
+        self.tables = tables
+        self.max_pieces = max((sum(signature) for signature in tables), default=0)
+        self.probes = 0
+        self.hits = 0
+    
+    def probe_bitboards(self, player1: int, player2: int, kings: int, player: int) -> Optional[Tuple[int, int]]:
+        """(result, plies to the end) for the side to move, or None if not covered."""
+        if not player1 or not player2:
+            # A side without pieces has lost
+            return (LOSS if not (player1 if player == 1 else player2) else WIN), 0
+        if (player1 | player2).bit_count() > self.max_pieces:
+            return None
+        men1, kings1, men2, kings2 = _split(player1, player2, kings)
+        signature = _signature_of(men1, kings1, men2, kings2)
+        table = self.tables.get(signature)
+        if table is None:
+            return None
+        return _decode(table[position_index(signature, men1, kings1, men2, kings2, player)])
+    
+    def probe(self, engine) -> Optional[Tuple[int, int]]:
+        """Probe the position of a DraughtsEngine or BitboardEngine."""
+        self.probes += 1
+        squares = getattr(engine, "piece_squares", None)
+        if squares is not None and len(squares[1]) + len(squares[2]) > self.max_pieces:
+            return None
+        player1, player2, kings = _bitboards(engine)
+        result = self.probe_bitboards(player1, player2, kings, engine.current_player)
+        if result is not None:
+            self.hits += 1
+        return result
+
+
+def load_tablebase(path: Optional[str]) -> Optional[Tablebase]:
+    """Memory-map a tablebase file, or return None if there is none."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a tablebase for these rules")
+    tables = {}
+    view = memoryview(data)
+    for i in range(count):
+        men1, kings1, men2, kings2, offset, length = DIRECTORY_ENTRY.unpack_from(
+            data, HEADER.size + i * DIRECTORY_ENTRY.size
+        )
+        if sys.byteorder == "little":
+            table = view[offset:offset + length].cast("H")
+        else:
+            # Copied to swap the bytes, instead of mapped
+            table = array("H", view[offset:offset + length])
+            table.byteswap()
+        tables[(men1, kings1, men2, kings2)] = table
+    return Tablebase(tables)
+
+
+def _table_bytes(table: Table) -> bytes:
+    """A table's values as little-endian bytes, for the file."""
+    table = array("H", table)
+    if sys.byteorder != "little":
+        table.byteswap()
+    return table.tobytes()
+
+
+def write_tablebase(path: str, tables: Dict[Signature, Table]):
+    """Write tables to disk in the indexed binary format."""
+    data = [_table_bytes(table) for table in tables.values()]
+    offset = HEADER.size + len(tables) * DIRECTORY_ENTRY.size
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(tables)))
+        for signature, table_bytes in zip(tables, data):
+            f.write(DIRECTORY_ENTRY.pack(*signature, offset, len(table_bytes)))
+            offset += len(table_bytes)
+        for table_bytes in data:
+            f.write(table_bytes)
+
+
+def signatures(max_pieces: int) -> List[Signature]:
+    """
+    Every signature with both sides on the board and at most max_pieces
+    pieces, in build order: captures and promotions only lead to signatures
+    earlier in the list.
+    """
+    found = []
+    for men1 in range(max_pieces + 1):
+        for kings1 in range(max_pieces + 1):
+            for men2 in range(max_pieces + 1):
+                for kings2 in range(max_pieces + 1):
+                    total = men1 + kings1 + men2 + kings2
+                    if men1 + kings1 and men2 + kings2 and total <= max_pieces:
+                        found.append((men1, kings1, men2, kings2))
+    return sorted(found, key=lambda s: (sum(s), s[0] + s[2], s))
+
+
+def _placements(signature: Signature) -> Iterator[Tuple[int, int, int, int]]:
+    """Every placement of a signature's pieces, as (men1, kings1, men2, kings2) bitboards."""
+    men1_count, kings1_count, men2_count, kings2_count = signature
+    # Men never stand on their own promotion row
+    men1_squares = [sq for sq in range(32) if not (1 << sq) & PROMOTION_ROW[1]]
+    men2_squares = [sq for sq in range(32) if not (1 << sq) & PROMOTION_ROW[2]]
+    
+    def boards(squares, count, taken):
+        for combo in combinations([sq for sq in squares if not taken >> sq & 1], count):
+            yield sum(1 << sq for sq in combo)
+    
+    for men1 in boards(men1_squares, men1_count, 0):
+        for kings1 in boards(range(32), kings1_count, men1):
+            for men2 in boards(men2_squares, men2_count, men1 | kings1):
+                for kings2 in boards(range(32), kings2_count, men1 | kings1 | men2):
+                    yield men1, kings1, men2, kings2
+
+
+def build_table(signature: Signature, tables: Dict[Signature, Table]) -> array:
+    """
+    Solve one signature by retrograde analysis, given the tables of every
+    signature its captures and promotions lead to. Moves come from
+    BitboardEngine, so the tables follow the engine's rules exactly.
+    Positions are resolved in order of distance: a position is won in d
+    plies if a move reaches a position lost in d - 1, and lost in d if every
+    move reaches a won position and the longest of those wins takes d - 1.
+    Positions never resolved are draws.
+    """
+    lookup = Tablebase(tables)
+    engine = BitboardEngine()
+    predecessors = {}
+    unresolved_moves = {}  # Moves not yet known to lose, for positions that may be lost
+    longest_win = {}
+    buckets = {}  # Distance -> [(index, result)] candidates
+    
+    for men1, kings1, men2, kings2 in _placements(signature):
+        for player in (1, 2):
+            index = position_index(signature, men1, kings1, men2, kings2, player)
+            engine.pieces = [0, men1 | kings1, men2 | kings2]
+            engine.kings = kings1 | kings2
+            engine.current_player = player
+            
+            moves = engine.get_all_valid_moves_for_player(player)
+            fastest_win = None
+            longest = 0
+            internal = 0
+            drawn = False
+            for move in moves:
+                engine.push_move(move)
+                child = _split(engine.pieces[1], engine.pieces[2], engine.kings)
+                child_player = engine.current_player
+                engine.pop_move()
+                
+                if _signature_of(*child) == signature:
+                    predecessors.setdefault(position_index(signature, *child, child_player), []).append(index)
+                    internal += 1
+                    continue
+                men1_child, kings1_child, men2_child, kings2_child = child
+                result, distance = lookup.probe_bitboards(
+                    men1_child | kings1_child, men2_child | kings2_child, kings1_child | kings2_child, child_player
+                )
+                if result == LOSS:
+                    fastest_win = distance + 1 if fastest_win is None else min(fastest_win, distance + 1)
+                elif result == WIN:
+                    longest = max(longest, distance + 1)
+                else:
+                    drawn = True
+            
+            if fastest_win is not None:
+                buckets.setdefault(fastest_win, []).append((index, WIN))
+            elif not drawn:
+                if internal:
+                    unresolved_moves[index] = internal
+                    longest_win[index] = longest
+                else:
+                    # No moves at all loses at once
+                    buckets.setdefault(longest, []).append((index, LOSS))
+    
+    table = array("H", bytes(2 * table_size(signature)))
+    resolved = set()
+    while buckets:
+        distance = min(buckets)
+        for index, result in buckets.pop(distance):
+            if index in resolved:
+                continue
+            resolved.add(index)
+            table[index] = _encode(result, distance)
+            for parent in predecessors.get(index, ()):
+                if parent in resolved:
+                    continue
+                if result == LOSS:
+                    buckets.setdefault(distance + 1, []).append((parent, WIN))
+                elif parent in unresolved_moves:
+                    unresolved_moves[parent] -= 1
+                    longest_win[parent] = max(longest_win[parent], distance + 1)
+                    if unresolved_moves[parent] == 0:
+                        buckets.setdefault(longest_win[parent], []).append((parent, LOSS))
+    return table
+
+
+def build_tablebase(max_pieces: int, verbose: bool = False) -> Dict[Signature, array]:
+    """Build the tables of every signature with at most max_pieces pieces."""
+    tables = {}
+    for signature in signatures(max_pieces):
+        start = time.perf_counter()
+        tables[signature] = build_table(signature, tables)
+        if verbose:
+            print(f"{signature}: {len(tables[signature])} slots in {time.perf_counter() - start:.1f}s")
+    return tables
+
+
+def main():
+    """Build endgame tables for positions with few pieces."""
+    import argparse
+    from app.core.config import settings
+    
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--pieces", type=int, default=3, help="Most pieces on the board")
+    parser.add_argument("--output", default=settings.AI_TABLEBASE_PATH)
+    args = parser.parse_args()
+    
+    tables = build_tablebase(args.pieces, verbose=True)
+    write_tablebase(args.output, tables)
+    print(f"{len(tables)} tables -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
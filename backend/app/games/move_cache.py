@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+
+Move = Tuple[Tuple[int, int], ...]
+
+
+class LegalMoveCache:
+    """
+    Legal moves by position, least recently used first, so the same
+    position is generated once whether it is validating a player's move,
+    checking for game over or starting an AI search. Entries are keyed by
+    Zobrist hash and side to move and hold the side's capture chains and
+    simple moves separately, since make_move checks a single piece and the
+    other callers want the side's moves. Thread-safe: games are played in
+    worker threads that share one cache.
+    """
+    
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def lookup(self, engine) -> Tuple[Tuple[Move, ...], Tuple[Move, ...]]:
+        """(captures, simple moves) for the side to move, generating them on a miss."""
+        key = (engine.hash, engine.current_player)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry
+            self.misses += 1
+        
+        # Generated outside the lock; a thread that raced us stores the same moves
+        captures, steps = engine.generate_side_moves()
+        entry = (tuple(captures), tuple(steps))
+        with self.lock:
+            self.entries[key] = entry
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return entry
+    
+    def get_moves(self, engine) -> Tuple[Move, ...]:
+        """Legal moves for the side to move, as get_all_valid_moves_for_player returns them."""
+        captures, steps = self.lookup(engine)
+        return captures or steps
+    
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> dict:
+        """Size and hit/miss counters."""
+        with self.lock:
+            size, hits, misses = len(self.entries), self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
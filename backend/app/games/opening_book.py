@@ -0,0 +1,188 @@
+import bisect
+import mmap
+import os
+import random
+import struct
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.games.bitboard_engine import POS_TO_SQUARE, SQUARE_TO_POS
+from app.games.draughts_engine import DraughtsEngine
+
+
+Move = Tuple[Tuple[int, int], ...]
+
+# Book file: an 8-byte header (magic, record count) followed by fixed-size
+# records sorted by position hash, one per (position, move):
+#   position hash (u64) | from square << 5 | to square (u16) | weight (u16)
+# Squares are the 32 playable squares numbered as in the bitboard engine.
+# A capture chain is stored by the squares it starts and ends on.
+MAGIC = b"DBK1"
+HEADER = struct.Struct("<4sI")
+RECORD = struct.Struct("<QHH")
+MAX_WEIGHT = 0xFFFF
+
+# How much a move counts for, by the result for the player who made it
+WEIGHT_PLAYED = 1
+WEIGHT_WON = 2
+
+
+def encode_move(move: Move) -> int:
+    return POS_TO_SQUARE[tuple(move[0])] << 5 | POS_TO_SQUARE[tuple(move[-1])]
+
+
+def decode_move(code: int) -> Move:
+    return SQUARE_TO_POS[code >> 5], SQUARE_TO_POS[code & 31]
+
+
+def build_opening_book(
+    games: Iterable[Tuple[List[dict], Optional[int]]],
+    max_plies: int = 12
+) -> Dict[int, Dict[Move, int]]:
+    """
+    Mine (move_history, winning player) pairs into position hash -> move ->
+    weight. Only the first max_plies moves of each game are used; replay
+    stops at the first move the engine rejects.
+    """
+    book = {}
+    for move_history, winner in games:
+        engine = DraughtsEngine()
+        for record in move_history[:max_plies]:
+            move = (tuple(record["from"]), tuple(record["to"]))
+            position = engine.hash
+            player = engine.current_player
+            if not engine.make_move(*move, record.get("path")):
+                break
+            weight = WEIGHT_PLAYED + (WEIGHT_WON if winner == player else 0)
+            moves = book.setdefault(position, {})
+            moves[move] = moves.get(move, 0) + weight
+    return book
+
+
+def write_opening_book(path: str, book: Dict[int, Dict[Move, int]]):
+    """Write a book to disk in the sorted binary format."""
+    records = sorted(
+        (position, encode_move(move), min(weight, MAX_WEIGHT))
+        for position, moves in book.items()
+        for move, weight in moves.items()
+    )
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(records)))
+        for record in records:
+            f.write(RECORD.pack(*record))
+
+
+class OpeningBook:
+    """
+    Read-only opening book over a memory-mapped book file. Worker processes
+    forked after loading share the mapped pages.
+    """
+    
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an opening book")
+    
+    def _hash_at(self, index: int) -> int:
+        return struct.unpack_from("<Q", self.data, HEADER.size + index * RECORD.size)[0]
+    
+    def get_moves(self, position: int) -> List[Tuple[Move, int]]:
+        """(move, weight) pairs stored for a position hash."""
+        index = bisect.bisect_left(_HashView(self), position)
+        moves = []
+        while index < self.count:
+            stored, code, weight = RECORD.unpack_from(self.data, HEADER.size + index * RECORD.size)
+            if stored != position:
+                break
+            moves.append((decode_move(code), weight))
+            index += 1
+        return moves
+    
+    def choose_move(self, engine, rng: Optional[random.Random] = None) -> Optional[Move]:
+        """Pick a legal book move for the position, weighted at random."""
+        # Book moves name only their first and last squares; the first
+        # legal move generated between them is played
+        legal = {}
+        for move in engine.get_all_valid_moves_for_player(engine.current_player):
+            legal.setdefault((move[0], move[-1]), move)
+        moves = [(legal[move], weight) for move, weight in self.get_moves(engine.hash) if move in legal]
+        if not moves:
+            return None
+        rng = rng or random
+        return rng.choices([move for move, _ in moves], weights=[weight for _, weight in moves])[0]
+
+
+class _HashView:
+    """Sequence view of the record hashes, for bisect."""
+    
+    def __init__(self, book: OpeningBook):
+        self.book = book
+    
+    def __len__(self) -> int:
+        return self.book.count
+    
+    def __getitem__(self, index: int) -> int:
+        return self.book._hash_at(index)
+
+
+def game_result(vs_ai: bool, winner_id: Optional[int], player1_id: int, is_draw: bool) -> Optional[int]:
+    """
+    The result of a completed game for the book: the winning player (1 or
+    2), 0 for a draw, or None if it has none. An AI win leaves winner_id
+    empty, so a vs-AI game with neither a winner nor a draw was won by
+    the AI, player 2.
+    """
+    if is_draw:
+        return 0
+    if winner_id is not None:
+        return 1 if winner_id == player1_id else 2
+    return 2 if vs_ai else None
+
+
+def load_opening_book(path: Optional[str]) -> Optional[OpeningBook]:
+    """Open a book file, or return None if there is none."""
+    if not path or not os.path.exists(path):
+        return None
+    return OpeningBook(path)
+
+
+def main():
+    """Build the opening book from the completed games in the database."""
+    import argparse
+    from app.core.config import settings
+    from app.db.database import SessionLocal
+    from app.models.models import Game, GameMode, GameStatus
+    from app.services.game_moves import iter_moves
+    
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--output", default=settings.AI_OPENING_BOOK_PATH)
+    parser.add_argument("--max-plies", type=int, default=12)
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        rows = db.query(Game.id, Game.mode, Game.winner_id, Game.player1_id, Game.is_draw).filter(
+            Game.status == GameStatus.COMPLETED
+        ).all()
+        games = []
+        for game_id, mode, winner_id, player1_id, is_draw in rows:
+            result = game_result(mode == GameMode.VS_AI, winner_id, player1_id, bool(is_draw))
+            if result is None:
+                continue
+            moves = list(iter_moves(db, game_id, to_ply=args.max_plies))
+            if not moves:
+                continue
+            # Drawn games weigh their moves as played only
+            games.append((moves, result or None))
+    finally:
+        db.close()
+    
+    book = build_opening_book(games, args.max_plies)
+    write_opening_book(args.output, book)
+    print(f"{len(games)} games, {len(book)} positions -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+from concurrent.futures import Executor
+from typing import List, Optional, Tuple
+from app.games.batch_eval import BatchEvaluator
+from app.games.bitboard_engine import BitboardEngine
+from app.games.draughts_ai import DraughtsAI
+from app.games.endgame_tablebase import Tablebase
+from app.games.transposition import TranspositionTable
+
+
+Move = Tuple[Tuple[int, int], ...]
+IterationResult = Tuple[int, float, Move]  # (depth, score, best move)
+
+# Root-split parallel search: the root moves are dealt out to worker
+# processes, each runs the normal iterative-deepening search over its share,
+# and the results of the deepest iteration every worker completed are
+# merged. Separate processes sidestep the GIL; each worker keeps its own
+# transposition table.
+
+
+def split_root_moves(moves: List[Move], parts: int) -> List[List[Move]]:
+    """Deal moves round-robin into at most `parts` non-empty shares."""
+    parts = max(1, min(parts, len(moves)))
+    return [moves[index::parts] for index in range(parts)]
+
+
+def search_root_share(
+    board_state: dict,
+    difficulty: str,
+    root_moves: List[Move],
+    time_budget: Optional[float] = None,
+    max_depth: Optional[int] = None,
+    transposition_table: Optional[TranspositionTable] = None,
+    tablebase: Optional[Tablebase] = None,
+    batch_evaluator: Optional[BatchEvaluator] = None,
+    collect_stats: bool = False
+) -> Tuple[List[IterationResult], Optional[dict]]:
+    """
+    Search a share of the root moves. Runs in a worker process.
+    Returns the best move and score of every completed iteration, and the
+    search statistics if collect_stats is set.
+    """
+    engine = BitboardEngine()
+    engine.set_board_state(board_state)
+    ai = DraughtsAI(
+        difficulty,
+        transposition_table,
+        time_budget,
+        tablebase=tablebase,
+        batch_evaluator=batch_evaluator,
+        collect_stats=collect_stats
+    )
+    if transposition_table is None:
+        ai.transposition_table = None
+    if max_depth is not None:
+        ai.max_depth = max_depth
+    ai.get_best_move(engine, root_moves)
+    return ai.iteration_results, ai.stats.to_dict() if ai.stats is not None else None
+
+
+def merge_root_results(moves: List[Move], results: List[List[IterationResult]]) -> Optional[Move]:
+    """
+    Pick the best move from the deepest iteration every share completed.
+    Equal scores go to the move generated first, as in a serial search.
+    """
+    results = [share for share in results if share]
+    if not results:
+        return None
+    depth = min(share[-1][0] for share in results)
+    generation_index = {move: index for index, move in enumerate(moves)}
+    candidates = [
+        (score, -generation_index[move], move)
+        for share in results
+        for result_depth, score, move in share
+        if result_depth == depth
+    ]
+    return max(candidates)[2]
+
+
+def parallel_best_move(
+    pool: Executor,
+    workers: int,
+    board_state: dict,
+    difficulty: str,
+    time_budget: Optional[float] = None,
+    max_depth: Optional[int] = None
+) -> Optional[Move]:
+    """Search a position with the root moves split across a process pool."""
+    engine = BitboardEngine()
+    engine.set_board_state(board_state)
+    moves = engine.get_all_valid_moves_for_player(engine.current_player)
+    if len(moves) < 2:
+        return moves[0] if moves else None
+    
+    jobs = [
+        pool.submit(search_root_share, board_state, difficulty, share, time_budget, max_depth)
+        for share in split_root_moves(moves, workers)
+    ]
+    return merge_root_results(moves, [job.result()[0] for job in jobs])
@@ -0,0 +1,119 @@
+import sys
+import time
+from typing import Dict, List, Tuple
+from app.games.bitboard_engine import BitboardEngine
+from app.games.draughts_engine import DraughtsEngine
+
+
+Move = Tuple[Tuple[int, int], ...]
+
+ENGINES = {"draughts": DraughtsEngine, "bitboard": BitboardEngine}
+
+# Stored positions and their leaf counts at depth 1, 2, 3... Counts come
+# from DraughtsEngine and agree with BitboardEngine. Men capture backwards
+# here, so from depth 5 the start position's counts differ from standard
+# checkers tables.
+POSITIONS: Dict[str, Tuple[str, List[int]]] = {
+    "start": (
+        "W:W21,22,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,9,10,11,12",
+        [7, 49, 302, 1469, 7482, 37986, 190146, 929902]
+    ),
+    "multi-jump": (
+        "W:W17,22,24,25,27,28,29,31,32:B1,2,3,4,7,8,9,10,16,19,20",
+        [1, 9, 66, 470, 3359, 21151, 138355]
+    ),
+    "kings-and-men": (
+        "B:WK4,21,23,24,29,32:B1,9,12,20,K26",
+        [2, 9, 68, 301, 1611, 6573, 33717, 134021]
+    ),
+    "middlegame": (
+        "W:W18,19,21,26,27,30,32:B4,5,7,8,10,K29",
+        [11, 59, 385, 1866, 9343, 43319, 202663]
+    ),
+    "endgame": (
+        "B:WK2:B8,12,16,20,K28,K30",
+        [7, 14, 104, 404, 3096, 8308, 64951, 224450]
+    ),
+}
+
+
+def perft(engine, depth: int) -> int:
+    """
+    Count the leaf nodes of the move tree depth plies deep. Works with
+    DraughtsEngine and BitboardEngine; the last ply is counted without
+    playing its moves.
+    """
+    if depth == 0:
+        return 1
+    moves = engine.get_all_valid_moves_for_player(engine.current_player)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        engine.push_move(move)
+        nodes += perft(engine, depth - 1)
+        engine.pop_move()
+    return nodes
+
+
+def divide(engine, depth: int) -> Dict[Move, int]:
+    """Leaf counts below each root move, for finding where two counts differ."""
+    counts = {}
+    for move in engine.get_all_valid_moves_for_player(engine.current_player):
+        engine.push_move(move)
+        counts[move] = perft(engine, depth - 1)
+        engine.pop_move()
+    return counts
+
+
+def load_position(fen: str, engine_name: str = "draughts"):
+    """An engine of the named kind set to a position."""
+    engine = ENGINES[engine_name]()
+    engine.set_board_state({"position": fen})
+    return engine
+
+
+def main():
+    """Count move-tree leaves from stored positions and check them against the reference counts."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--depth", type=int, default=6, help="Deepest depth counted")
+    parser.add_argument("--position", choices=sorted(POSITIONS), action="append",
+                        help="Stored position to count (repeatable; default all)")
+    parser.add_argument("--fen", help="Count this position instead of the stored ones")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="draughts")
+    parser.add_argument("--divide", action="store_true", help="Print the count below each root move")
+    args = parser.parse_args()
+    
+    if args.fen:
+        positions = {"fen": (args.fen, [])}
+    else:
+        positions = {name: POSITIONS[name] for name in args.position or POSITIONS}
+    
+    failures = 0
+    for name, (fen, reference) in positions.items():
+        print(f"{name}: {fen}")
+        engine = load_position(fen, args.engine)
+        if args.divide:
+            for move, nodes in divide(engine, args.depth).items():
+                print(f"  {' -> '.join(str(square) for square in move)}: {nodes}")
+        
+        for depth in range(1, args.depth + 1):
+            start = time.perf_counter()
+            nodes = perft(engine, depth)
+            elapsed = time.perf_counter() - start
+            nps = nodes / elapsed if elapsed > 0 else 0.0
+            if depth <= len(reference):
+                ok = nodes == reference[depth - 1]
+                failures += not ok
+                check = "ok" if ok else f"MISMATCH (expected {reference[depth - 1]})"
+            else:
+                check = "no reference"
+            print(f"  depth {depth:>2} {nodes:>12} nodes {elapsed:>8.3f}s {nps:>12,.0f} nps  {check}")
+    
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
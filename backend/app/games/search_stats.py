@@ -0,0 +1,87 @@
+import time
+from typing import List, Optional, Tuple
+
+
+Move = Tuple[Tuple[int, int], ...]
+
+
+class SearchStats:
+    """
+    Statistics of one DraughtsAI move choice. Time in move generation and
+    evaluation is measured by wrapping those functions for the length of the
+    search (see timed), so a search without statistics runs no extra code.
+    source says how the move was chosen: "search", "book", "tablebase" or
+    "random".
+    """
+    
+    def __init__(self, difficulty: str):
+        self.difficulty = difficulty
+        self.source = "search"
+        self.nodes = 0
+        self.depth = 0
+        self.cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.movegen = [0, 0.0]  # [calls, seconds]
+        self.evaluation = [0, 0.0]
+        self.seconds = 0.0
+        self.score = None
+        self.principal_variation = []
+    
+    def to_dict(self) -> dict:
+        return {
+            "difficulty": self.difficulty,
+            "source": self.source,
+            "nodes": self.nodes,
+            "depth": self.depth,
+            "cutoffs": self.cutoffs,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "movegen_calls": self.movegen[0],
+            "movegen_seconds": self.movegen[1],
+            "eval_calls": self.evaluation[0],
+            "eval_seconds": self.evaluation[1],
+            "seconds": self.seconds,
+            "nps": self.nodes / self.seconds if self.seconds > 0 else 0.0,
+            "score": self.score,
+            "principal_variation": [[list(square) for square in move] for move in self.principal_variation],
+        }
+
+
+def timed(function, timing: list):
+    """Wrap a function to add its calls and seconds to a [calls, seconds] pair."""
+    perf_counter = time.perf_counter
+    
+    def wrapper(*args):
+        start = perf_counter()
+        result = function(*args)
+        timing[0] += 1
+        timing[1] += perf_counter() - start
+        return result
+    
+    return wrapper
+
+
+def merge_stats(shares: List[Optional[dict]], move: Optional[Move]) -> Optional[dict]:
+    """
+    Combine the statistics of a root-split search's shares. Counters add up;
+    depth is the deepest every share completed and seconds the slowest
+    share. The score and principal variation are those of the share that
+    found the chosen move.
+    """
+    shares = [share for share in shares if share]
+    if not shares:
+        return None
+    merged = dict(shares[0])
+    for key in ("nodes", "cutoffs", "tt_probes", "tt_hits", "movegen_calls", "movegen_seconds",
+                "eval_calls", "eval_seconds"):
+        merged[key] = sum(share[key] for share in shares)
+    merged["depth"] = min(share["depth"] for share in shares)
+    merged["seconds"] = max(share["seconds"] for share in shares)
+    merged["nps"] = merged["nodes"] / merged["seconds"] if merged["seconds"] > 0 else 0.0
+    first_move = [list(square) for square in move] if move else None
+    for share in shares:
+        if share["principal_variation"][:1] == [first_move]:
+            merged["score"] = share["score"]
+            merged["principal_variation"] = share["principal_variation"]
+    return merged
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+
+Move = Tuple[Tuple[int, int], ...]
+
+# Score bound types
+EXACT = 0
+LOWER_BOUND = 1  # Real score is at least the stored score (beta cutoff)
+UPPER_BOUND = 2  # Real score is at most the stored score (no move raised alpha)
+
+
+class TTEntry(NamedTuple):
+    key: int
+    depth: int
+    flag: int
+    score: float
+    best_move: Optional[Move]
+    generation: int
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table keyed by Zobrist hash.
+    One entry per slot; a new entry replaces the old one when the old one is
+    from an earlier search or was searched no deeper (depth-preferred with
+    ageing). Scores are stored from the point of view of the side to move.
+    """
+    
+    ENTRY_SIZE = 128  # Approximate bytes per stored entry, including Python object overhead
+    
+    def __init__(self, size_mb: float = 8):
+        self.capacity = max(1, int(size_mb * 1024 * 1024) // self.ENTRY_SIZE)
+        self.slots = [None] * self.capacity
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+    
+    def new_search(self):
+        """Mark the start of a new search so older entries become replaceable."""
+        self.generation += 1
+    
+    def clear(self):
+        """Drop every entry."""
+        self.slots = [None] * self.capacity
+        self.generation = 0
+    
+    def probe(self, key: int) -> Optional[TTEntry]:
+        """Get the entry stored for a position hash, if any."""
+        self.probes += 1
+        entry = self.slots[key % self.capacity]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        return None
+    
+    def store(self, key: int, depth: int, flag: int, score: float, best_move: Optional[Move]):
+        """Store a search result, subject to the replacement policy."""
+        index = key % self.capacity
+        old = self.slots[index]
+        if old is not None and old.generation == self.generation and depth < old.depth:
+            return
+        if best_move is None and old is not None and old.key == key:
+            best_move = old.best_move
+        self.slots[index] = TTEntry(key, depth, flag, score, best_move, self.generation)
+
+
+class TranspositionTableCache:
+    """
+    Transposition tables by key (a game id), least recently used first, so
+    each AI turn of a game reuses the work of the previous one. Only the
+    most recently used max_tables tables are kept.
+    """
+    
+    def __init__(self, max_tables: int, size_mb: float):
+        self.max_tables = max_tables
+        self.size_mb = size_mb
+        self.tables = OrderedDict()
+    
+    def get(self, key) -> TranspositionTable:
+        """Get the table for a key, creating it if needed."""
+        table = self.tables.get(key)
+        if table is None:
+            table = TranspositionTable(self.size_mb)
+            self.tables[key] = table
+            while len(self.tables) > self.max_tables:
+                self.tables.popitem(last=False)
+        else:
+            self.tables.move_to_end(key)
+        return table
+    
+    def discard(self, key):
+        """Drop the table for a key, if there is one."""
+        self.tables.pop(key, None)
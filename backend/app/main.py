@@ -1,8 +1,15 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.db.database import engine, Base
-from app.api.endpoints import auth, games, payments
+from app.api.endpoints import auth, games, payments, websocket
+from app.services.ai_executor import get_ai_executor, shutdown_ai_executor
+from app.services.game_clock import flag_scheduler
+from app.services.game_events import game_events
+from app.services.game_service import GameService
+from app.services.search_metrics import search_metrics
+import asyncio
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -26,6 +33,32 @@ app.add_middleware(
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(games.router, prefix="/api/v1/games", tags=["Games"])
 app.include_router(payments.router, prefix="/api/v1/payments", tags=["Payments"])
+app.include_router(websocket.router, prefix="/ws", tags=["WebSocket"])
+
+
+@app.on_event("startup")
+async def start_ai_executor():
+    """
+    Start delivering game events, move the legacy move histories of games
+    in progress into game_moves, recover the logged moves not flushed
+    before the server last stopped, start watching the game clocks, start
+    the AI worker processes and finish AI replies left pending.
+    """
+    game_events.start()
+    await asyncio.to_thread(GameService.migrate_live_games)
+    await asyncio.to_thread(GameService.flush_games)
+    flag_scheduler.start(GameService.flag_games)
+    await asyncio.to_thread(GameService.schedule_clocks)
+    await GameService.resume_ai_replies(await asyncio.to_thread(get_ai_executor))
+
+
+@app.on_event("shutdown")
+def stop_ai_executor():
+    """Stop the AI worker processes and the game clocks, flush the live games' moves and stop game events."""
+    shutdown_ai_executor()
+    flag_scheduler.stop()
+    GameService.flush_games()
+    game_events.stop()
 
 
 @app.get("/")
@@ -45,6 +78,12 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """AI search metrics by difficulty, in the Prometheus text format."""
+    return PlainTextResponse(search_metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8080)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -86,14 +86,15 @@ class Game(Base):
     # Game state
     status = Column(Enum(GameStatus), default=GameStatus.WAITING)
     board_state = Column(JSON)  # Store current board position
-    move_history = Column(JSON, default=[])
+    move_history = Column(JSON, default=[])  # Legacy; moves are in game_moves
     current_turn = Column(Integer)  # Player ID whose turn it is
+    ai_thinking = Column(Boolean, default=False)  # AI reply to the last move not played yet
     
     # Time control (chess clock)
     time_control = Column(Integer, default=600)  # Total time in seconds (default 10 min)
     time_increment = Column(Integer, default=5)  # Increment per move in seconds
-    player1_time_left = Column(Integer)  # Remaining time for player1 in seconds
-    player2_time_left = Column(Integer)  # Remaining time for player2 in seconds
+    player1_time_left = Column(Float)  # Remaining time for player1 in seconds
+    player2_time_left = Column(Float)  # Remaining time for player2 in seconds
     last_move_time = Column(DateTime(timezone=True))  # When last move was made
     
     # Results
@@ -116,6 +117,32 @@ class Game(Base):
     player2 = relationship("User", foreign_keys=[player2_id], back_populates="games_as_player2")
 
 
+class MoveRecord(Base):
+    __tablename__ = "game_moves"
+    __table_args__ = (
+        # Replay reads a game's moves in ply order from this index alone
+        # (covering on PostgreSQL; elsewhere the other columns come from the table)
+        Index(
+            "ix_game_moves_replay", "game_id", "ply", unique=True,
+            postgresql_include=["player", "from_square", "to_square", "path", "captures", "clock", "played_at"]
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
+    ply = Column(Integer, nullable=False)  # 1 for the first move
+    player = Column(Integer, nullable=False)  # 1 or 2
+    
+    # Squares numbered 1-32 as in the compact position format
+    from_square = Column(Integer, nullable=False)
+    to_square = Column(Integer, nullable=False)
+    path = Column(String)  # Squares landed on in between in a capture chain, e.g. "15,24"
+    captures = Column(String)  # Squares of the captured pieces, e.g. "11,20,27"
+    
+    clock = Column(Float)  # Mover's time left after the move, in seconds
+    played_at = Column(DateTime(timezone=True))
+
+
 class Transaction(Base):
     __tablename__ = "transactions"
     
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import List, Literal, Optional
 from datetime import datetime
 from enum import Enum
+from app.games.draughts_engine import expand_board_state
 
 
 # User Schemas
@@ -73,7 +74,10 @@ class GameCreate(BaseModel):
 class GameMove(BaseModel):
     game_id: int
     from_position: tuple[int, int]
-    to_position: tuple[int, int]
+    to_position: tuple[int, int]  # Where the move ends, after a whole capture chain
+    path: Optional[List[tuple[int, int]]] = None  # Squares landed on in between, if two chains end on the same square
+    wait_for_ai: bool = True  # False: return at once, AI reply arrives later
+    board_format: Literal["board", "fen"] = "board"  # "fen": return the compact position string
 
 
 class GameResponse(BaseModel):
@@ -84,14 +88,22 @@ class GameResponse(BaseModel):
     player1_id: int
     player2_id: Optional[int]
     current_turn: Optional[int]
+    ai_thinking: Optional[bool] = None
     board_state: Optional[dict]
     time_control: Optional[int]
     time_increment: Optional[int]
-    player1_time_left: Optional[int]
-    player2_time_left: Optional[int]
+    player1_time_left: Optional[float]
+    player2_time_left: Optional[float]
     last_move_time: Optional[datetime]
     created_at: datetime
     
+    # Games are stored with the compact position; clients get the full board
+    # unless they ask for the compact form
+    @field_validator("board_state")
+    @classmethod
+    def expand_position(cls, value: Optional[dict]) -> Optional[dict]:
+        return expand_board_state(value)
+    
     class Config:
         from_attributes = True
 
@@ -0,0 +1,370 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Tuple
+from app.core.config import settings
+from app.games.batch_eval import load_batch_evaluator
+from app.games.bitboard_engine import BitboardEngine
+from app.games.draughts_ai import DraughtsAI
+from app.games.endgame_tablebase import load_tablebase
+from app.games.move_cache import LegalMoveCache
+from app.games.opening_book import load_opening_book
+from app.games.parallel_search import merge_root_results, search_root_share, split_root_moves
+from app.games.search_stats import merge_stats
+from app.games.transposition import TranspositionTableCache
+from app.services.search_metrics import search_metrics
+
+
+Move = Tuple[Tuple[int, int], ...]
+
+# AI transposition tables by game id. In the process executor, each worker
+# holds those of the games pinned to it.
+transposition_tables = TranspositionTableCache(settings.AI_TT_MAX_GAMES, settings.AI_TT_SIZE_MB)
+
+# Opening book, memory-mapped once at startup; forked pool workers share it
+opening_book = load_opening_book(settings.AI_OPENING_BOOK_PATH)
+
+# Endgame tablebase, memory-mapped the same way
+tablebase = load_tablebase(settings.AI_TABLEBASE_PATH)
+
+# Legal moves by position, shared by move validation, game-over checks and
+# AI roots in this process
+legal_move_cache = LegalMoveCache(settings.MOVE_CACHE_SIZE)
+
+# NumPy leaf evaluator, if enabled and NumPy is installed
+batch_evaluator = load_batch_evaluator() if settings.AI_BATCH_EVAL else None
+
+
+def _reset_move_cache_lock():
+    """Pool workers are forked while request threads may hold the cache's lock."""
+    legal_move_cache.lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_move_cache_lock)
+
+
+def run_search(
+    game_id: Optional[int],
+    board_state: dict,
+    difficulty: str,
+    max_depth: Optional[int] = None,
+    time_budget: Optional[float] = None
+) -> Tuple[Optional[Move], Optional[dict]]:
+    """
+    Run one AI search on a board state and return the chosen move with the
+    search statistics (None unless AI_SEARCH_STATS is set).
+    Module level so process pool workers can run it.
+    """
+    engine = BitboardEngine()
+    engine.set_board_state(board_state)
+    table = transposition_tables.get(game_id) if game_id is not None else None
+    ai = DraughtsAI(
+        difficulty,
+        table,
+        time_budget,
+        opening_book,
+        tablebase,
+        legal_move_cache,
+        batch_evaluator,
+        settings.AI_SEARCH_STATS
+    )
+    if max_depth is not None:
+        ai.max_depth = min(ai.max_depth, max_depth)
+    move = ai.get_best_move(engine)
+    return move, ai.stats.to_dict() if ai.stats is not None else None
+
+
+def search_best_move(
+    game_id: Optional[int],
+    board_state: dict,
+    difficulty: str,
+    max_depth: Optional[int] = None,
+    time_budget: Optional[float] = None
+) -> Optional[Move]:
+    """Run one AI search in this process, record its statistics and return the chosen move."""
+    move, stats = run_search(game_id, board_state, difficulty, max_depth, time_budget)
+    search_metrics.record(game_id, stats)
+    return move
+
+
+def search_root_share_job(game_id: int, board_state: dict, difficulty: str, root_moves: list) -> tuple:
+    """Search one share of a root-split search with this worker's table for the game."""
+    return search_root_share(
+        board_state,
+        difficulty,
+        root_moves,
+        transposition_table=transposition_tables.get(game_id),
+        tablebase=tablebase,
+        batch_evaluator=batch_evaluator,
+        collect_stats=settings.AI_SEARCH_STATS
+    )
+
+
+def quick_move(board_state: dict) -> Optional[Move]:
+    """
+    The legal move with the best evaluation one ply ahead, without a search:
+    cheap enough to answer in the API process when the workers cannot.
+    """
+    engine = BitboardEngine()
+    engine.set_board_state(board_state)
+    player = engine.current_player
+    best_move, best_score = None, None
+    for move in engine.get_all_valid_moves_for_player(player):
+        engine.push_move(move)
+        score = engine.evaluate_board(player)
+        engine.pop_move()
+        if best_score is None or score > best_score:
+            best_move, best_score = move, score
+    return best_move
+
+
+def _warm_up_worker():
+    """Process pool initializer: run a tiny search so the first real job starts hot."""
+    run_search(None, BitboardEngine().get_board_state(), "easy", max_depth=1)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _discard_table(game_id: int):
+    transposition_tables.discard(game_id)
+
+
+class AIExecutor:
+    """
+    Runs AI searches for the move endpoint without blocking the event loop.
+    This base executor searches in a thread of the API process; it is meant
+    for development and tests, since the search still holds the GIL.
+    """
+    
+    def start(self):
+        """Start any workers."""
+    
+    def shutdown(self):
+        """Stop any workers."""
+    
+    async def get_best_move(self, game_id: int, board_state: dict, difficulty: str) -> Optional[Move]:
+        """Search a position and return the AI's move."""
+        return await asyncio.to_thread(search_best_move, game_id, board_state, difficulty)
+    
+    async def get_fallback_move(self, board_state: dict, difficulty: str) -> Optional[Move]:
+        """Quick shallow search used when the full search cannot run."""
+        return await asyncio.to_thread(
+            search_best_move,
+            None,
+            board_state,
+            difficulty,
+            settings.AI_FALLBACK_DEPTH,
+            settings.AI_FALLBACK_TIME_BUDGET
+        )
+    
+    def discard_table(self, game_id: int):
+        """Drop a game's transposition table once the game has ended."""
+        transposition_tables.discard(game_id)
+
+
+class ProcessPoolAIExecutor(AIExecutor):
+    """
+    Runs AI searches in warm worker processes, so a long search neither
+    ties up a request thread nor holds the API process's GIL. Each worker is
+    a pool of its own and every game is pinned to one by its id, so the
+    game's transposition table there is reused from move to move.
+    At most max_queue jobs are in the workers at once, counted until a
+    worker is done with them even if their search was abandoned; beyond
+    that, and for searches that exceed job_timeout seconds, quick_move
+    answers instead. With parallel_workers above 1, searches at the
+    AI_PARALLEL_DIFFICULTIES levels split their root moves across that many
+    workers, starting at the game's own.
+    """
+    
+    def __init__(self, workers: int, max_queue: int, job_timeout: float, parallel_workers: int = 1):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self.parallel_workers = parallel_workers
+        self.pools: List[ProcessPoolExecutor] = []
+        self.pending = 0
+        self.pending_lock = threading.Lock()  # Jobs finish in the pools' threads
+        self.start_lock = asyncio.Lock()
+    
+    @staticmethod
+    def start_worker() -> ProcessPoolExecutor:
+        """A single-worker pool, its process spawned and warmed up."""
+        pool = ProcessPoolExecutor(max_workers=1, initializer=_warm_up_worker)
+        pool.submit(_ping).result()
+        return pool
+    
+    def start(self):
+        """Start every worker now instead of on first use."""
+        self.pools = [self.start_worker() for _ in range(self.workers)]
+    
+    def shutdown(self):
+        """Stop the workers, dropping searches that have not started."""
+        for pool in self.pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.pools = []
+    
+    async def restart(self, index: Optional[int] = None, broken: Optional[ProcessPoolExecutor] = None):
+        """
+        Replace a worker's broken pool, or start the workers if there are
+        none (index=None), unless another request already has. Workers are
+        spawned in a thread so the event loop is not blocked.
+        """
+        async with self.start_lock:
+            if index is None:
+                if not self.pools:
+                    await asyncio.to_thread(self.start)
+            elif self.pools and self.pools[index] is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.pools[index] = await asyncio.to_thread(self.start_worker)
+    
+    async def restart_broken(self, indexes: List[int]):
+        """Replace the pools among some workers' that a dead process broke."""
+        for index in set(indexes):
+            pool = self.pools[index]
+            try:
+                pool.submit(_ping)
+            except BrokenProcessPool:
+                await self.restart(index, pool)
+    
+    def worker_indexes(self, game_id: Optional[int], jobs: int) -> List[int]:
+        """The workers for a game's jobs: the game's own, then the ones after it."""
+        home = game_id % len(self.pools) if game_id is not None else 0
+        return [(home + offset) % len(self.pools) for offset in range(jobs)]
+    
+    def reserve(self, jobs: int) -> bool:
+        """Count jobs as pending, unless that would exceed max_queue."""
+        with self.pending_lock:
+            if self.pending + jobs > self.max_queue:
+                return False
+            self.pending += jobs
+            return True
+    
+    def release(self, jobs: int = 1):
+        with self.pending_lock:
+            self.pending -= jobs
+    
+    def submit_jobs(self, jobs: List[Tuple[int, Callable, tuple]]) -> List[asyncio.Future]:
+        """
+        Run reserved jobs, (worker index, function, args) each. A job is
+        released when its worker is done with it; cancelling the returned
+        future stops a job only if it has not started.
+        """
+        futures = []
+        for submitted, (index, function, args) in enumerate(jobs):
+            try:
+                future = self.pools[index].submit(function, *args)
+            except Exception:
+                self.release(len(jobs) - submitted)
+                raise
+            future.add_done_callback(lambda _: self.release())
+            futures.append(asyncio.wrap_future(future))
+        return futures
+    
+    def split_search(self, board_state: dict, difficulty: str):
+        """(root moves, shares) for a root-split search, or None to search in one job."""
+        if self.parallel_workers < 2 or difficulty not in settings.AI_PARALLEL_DIFFICULTIES:
+            return None
+        engine = BitboardEngine()
+        engine.set_board_state(board_state)
+        moves = engine.get_all_valid_moves_for_player(engine.current_player)
+        if len(moves) < 2:
+            return None
+        if opening_book is not None and opening_book.get_moves(engine.hash):
+            # Book positions are answered by a single job without searching
+            return None
+        if tablebase is not None and tablebase.probe(engine) is not None:
+            return None
+        return moves, split_root_moves(moves, self.parallel_workers)
+    
+    async def get_best_move(self, game_id: int, board_state: dict, difficulty: str) -> Optional[Move]:
+        """Search a position in the game's workers and return the AI's move."""
+        if not self.pools:
+            await self.restart()
+        split = self.split_search(board_state, difficulty)
+        jobs = 1 if split is None else len(split[1])
+        if not self.reserve(jobs):
+            return await self.get_fallback_move(board_state, difficulty)
+        
+        indexes = self.worker_indexes(game_id, jobs)
+        try:
+            if split is None:
+                search, = self.submit_jobs([(indexes[0], run_search, (game_id, board_state, difficulty))])
+                move, stats = await asyncio.wait_for(search, self.job_timeout)
+                search_metrics.record(game_id, stats)
+                return move
+            
+            moves, shares = split
+            search = asyncio.gather(*self.submit_jobs([
+                (index, search_root_share_job, (game_id, board_state, difficulty, share))
+                for index, share in zip(indexes, shares)
+            ]))
+            results = await asyncio.wait_for(search, self.job_timeout)
+            move = merge_root_results(moves, [share_results for share_results, _ in results])
+            search_metrics.record(game_id, merge_stats([stats for _, stats in results], move))
+            return move
+        except asyncio.TimeoutError:
+            return await self.get_fallback_move(board_state, difficulty)
+        except BrokenProcessPool:
+            # A worker died; replace it and answer this move without it
+            await self.restart_broken(indexes)
+            return await self.get_fallback_move(board_state, difficulty)
+    
+    async def get_fallback_move(self, board_state: dict, difficulty: str) -> Optional[Move]:
+        """quick_move: a search in the API process would hold the GIL the workers are there to spare."""
+        return quick_move(board_state)
+    
+    def discard_table(self, game_id: int):
+        """Drop a game's transposition tables in the workers its searches ran in."""
+        if not self.pools:
+            return
+        for index in set(self.worker_indexes(game_id, max(1, self.parallel_workers))):
+            try:
+                self.pools[index].submit(_discard_table, game_id)
+            except (BrokenProcessPool, RuntimeError):
+                # A replaced or stopped worker holds no tables
+                pass
+
+
+_executor: Optional[AIExecutor] = None
+
+
+def create_ai_executor() -> AIExecutor:
+    """Build the executor selected by the AI_EXECUTOR setting."""
+    if settings.AI_EXECUTOR == "process":
+        workers = settings.AI_WORKERS or max(1, (os.cpu_count() or 2) - 1)
+        return ProcessPoolAIExecutor(
+            workers,
+            settings.AI_MAX_QUEUE,
+            settings.AI_JOB_TIMEOUT,
+            settings.AI_PARALLEL_WORKERS
+        )
+    return AIExecutor()
+
+
+def get_ai_executor() -> AIExecutor:
+    """Get the process-wide AI executor, starting it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = create_ai_executor()
+        _executor.start()
+    return _executor
+
+
+def discard_table(game_id: int):
+    """Drop an ended game's transposition tables, wherever the executor keeps them."""
+    if _executor is not None:
+        _executor.discard_table(game_id)
+    else:
+        transposition_tables.discard(game_id)
+
+
+def shutdown_ai_executor():
+    """Stop the process-wide AI executor."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
@@ -0,0 +1,160 @@
+import asyncio
+import heapq
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from app.models.models import Game, GameMode, GameStatus
+
+
+def as_utc(moment: datetime) -> datetime:
+    """A naive UTC datetime, as the games table is written, from a naive or aware one."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def mover(game: Game) -> int:
+    """The player (1 or 2) whose clock is running."""
+    return 1 if game.current_turn == game.player1_id else 2
+
+
+def time_left(game: Game, now: datetime) -> Optional[float]:
+    """
+    Seconds left at a moment (naive UTC) on a game's running clock; None if
+    the game is not timed or its clock has not started. The games row holds
+    each player's time when their clock last stopped and when that was.
+    """
+    if game.mode != GameMode.VS_PLAYER or game.status != GameStatus.IN_PROGRESS or game.last_move_time is None:
+        return None
+    left = game.player1_time_left if mover(game) == 1 else game.player2_time_left
+    if left is None:
+        return None
+    return left - (now - as_utc(game.last_move_time)).total_seconds()
+
+
+def charge(game: Game, now: datetime):
+    """
+    Stop the mover's clock after a move: charge the time since the last
+    move, add the increment and start the opponent's clock from now.
+    Times are kept to the fraction of a second, so quick moves cost what
+    they took.
+    """
+    left = time_left(game, now)
+    if left is None:
+        return
+    left = max(0.0, left) + (game.time_increment or 0)
+    if mover(game) == 1:
+        game.player1_time_left = left
+    else:
+        game.player2_time_left = left
+    game.last_move_time = now
+
+
+def deadline(game: Game) -> Optional[float]:
+    """When a game's running clock falls, as a Unix time; None if it has no running clock."""
+    if game.last_move_time is None:
+        return None
+    started = as_utc(game.last_move_time)
+    left = time_left(game, started)
+    if left is None:
+        return None
+    return started.replace(tzinfo=timezone.utc).timestamp() + left
+
+
+class FlagScheduler:
+    """
+    The moments the running clocks of games fall, in a heap watched by one
+    asyncio task: it sleeps until the earliest and wakes early only when an
+    earlier one is set, so no game is polled. Rescheduling a game leaves its
+    old entry in the heap, skipped when it comes up. Thread-safe, so
+    GameService can schedule from the worker threads it commits in.
+    """
+    
+    # Retry delay, in seconds, when ending games on time fails
+    RETRY_SECONDS = 5.0
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.deadlines: Dict[int, float] = {}
+        self.heap: List[Tuple[float, int]] = []
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+    
+    def start(self, on_flag: Callable[[List[int]], None]):
+        """
+        Watch the deadlines from the running event loop. on_flag is called
+        in a worker thread with the games whose deadline has passed; it
+        checks their clocks and ends or reschedules them.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self.run(on_flag))
+    
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+    
+    def schedule(self, game_id: int, deadline: float):
+        """Set the Unix time a game's running clock falls, replacing the one set before."""
+        with self.lock:
+            self.deadlines[game_id] = deadline
+            heapq.heappush(self.heap, (deadline, game_id))
+            earliest = self.heap[0] == (deadline, game_id)
+            if len(self.heap) > 2 * len(self.deadlines) + 1024:
+                # Drop the entries left by rescheduling
+                self.heap = [(when, game) for game, when in self.deadlines.items()]
+                heapq.heapify(self.heap)
+        if earliest and self.loop is not None:
+            try:
+                self.loop.call_soon_threadsafe(self.wakeup.set)
+            except RuntimeError:
+                # The event loop has closed
+                pass
+    
+    def schedule_game(self, game: Game):
+        """Schedule the fall of a game's running clock, if it has one."""
+        when = deadline(game)
+        if when is not None:
+            self.schedule(game.id, when)
+    
+    def cancel(self, game_id: int):
+        """Forget a game's deadline, once it has ended."""
+        with self.lock:
+            self.deadlines.pop(game_id, None)
+    
+    def due(self, now: float) -> Tuple[List[int], Optional[float]]:
+        """Take the games whose deadline has passed; also return the next deadline."""
+        games = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                when, game_id = heapq.heappop(self.heap)
+                if self.deadlines.get(game_id) == when:
+                    del self.deadlines[game_id]
+                    games.append(game_id)
+            return games, self.heap[0][0] if self.heap else None
+    
+    async def run(self, on_flag: Callable[[List[int]], None]):
+        while True:
+            self.wakeup.clear()
+            games, next_deadline = self.due(time.time())
+            if games:
+                try:
+                    await asyncio.to_thread(on_flag, games)
+                except Exception:
+                    # Try again shortly; the clocks are checked again then
+                    for game_id in games:
+                        self.schedule(game_id, time.time() + self.RETRY_SECONDS)
+                continue
+            
+            timeout = None if next_deadline is None else max(0.0, next_deadline - time.time())
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Process-wide flag scheduler
+flag_scheduler = FlagScheduler()
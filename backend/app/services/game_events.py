@@ -0,0 +1,119 @@
+import asyncio
+import json
+import threading
+from typing import Dict, Set, Tuple
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # Redis is optional; only GAME_EVENTS=redis needs it
+    redis = None
+
+
+class GameEventBroker:
+    """
+    Publishes game events (moves, clocks, results) to the WebSocket
+    connections subscribed to them. This broker delivers within this
+    process only, which is enough for a single API process and for tests;
+    RedisGameEventBroker delivers through Redis to every API process.
+    Publishing is thread-safe, so GameService can publish from the worker
+    threads it commits in; each subscriber receives events on its own event
+    loop, in publishing order.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+    
+    def start(self):
+        pass
+    
+    def stop(self):
+        pass
+    
+    def subscribe(self, game_id: int) -> asyncio.Queue:
+        """Queue that receives a game's events. Call from the subscriber's event loop."""
+        queue = asyncio.Queue()
+        with self.lock:
+            self.subscribers.setdefault(game_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+    
+    def unsubscribe(self, game_id: int, queue: asyncio.Queue):
+        """Stop delivering a game's events to a queue."""
+        with self.lock:
+            subscribers = self.subscribers.get(game_id, set())
+            subscribers.difference_update([entry for entry in subscribers if entry[1] is queue])
+            if not subscribers:
+                self.subscribers.pop(game_id, None)
+    
+    def publish(self, game_id: int, event: dict):
+        """Deliver an event to every subscriber of a game."""
+        self.deliver(game_id, event)
+    
+    def deliver(self, game_id: int, event: dict):
+        """Deliver an event to this process's subscribers of a game."""
+        with self.lock:
+            subscribers = list(self.subscribers.get(game_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # The subscriber's event loop has closed
+                pass
+
+
+class RedisGameEventBroker(GameEventBroker):
+    """
+    Publishes game events on a Redis channel per game, so they reach the
+    WebSocket connections of every API process, whichever process played
+    the move. Each process listens to all game channels in a background
+    thread and delivers to its own subscribers.
+    """
+    
+    CHANNEL_PREFIX = "draughts:game_events:"
+    
+    def __init__(self, url: str):
+        super().__init__()
+        if redis is None:
+            raise RuntimeError("GAME_EVENTS=redis needs the redis package")
+        if not url:
+            raise RuntimeError("GAME_EVENTS=redis needs REDIS_URL")
+        self.client = redis.Redis.from_url(url)
+        self.listener = None
+    
+    def start(self):
+        """Start listening to every game's channel."""
+        if self.listener is None:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(**{self.CHANNEL_PREFIX + "*": self.on_message})
+            self.listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+    
+    def stop(self):
+        """Stop listening."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+    
+    def publish(self, game_id: int, event: dict):
+        """Publish an event to the subscribers of a game in every API process."""
+        try:
+            self.client.publish(f"{self.CHANNEL_PREFIX}{game_id}", json.dumps(event))
+        except redis.RedisError:
+            # The update is committed either way; clients get the game's
+            # state again when they reconnect
+            pass
+    
+    def on_message(self, message: dict):
+        game_id = int(message["channel"].rsplit(b":", 1)[1])
+        self.deliver(game_id, json.loads(message["data"]))
+
+
+def create_game_event_broker() -> GameEventBroker:
+    """Build the broker selected by the GAME_EVENTS setting."""
+    if settings.GAME_EVENTS == "redis":
+        return RedisGameEventBroker(settings.REDIS_URL)
+    return GameEventBroker()
+
+
+# Process-wide game event broker
+game_events = create_game_event_broker()
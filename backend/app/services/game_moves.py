@@ -0,0 +1,211 @@
+import sys
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.games.draughts_engine import SQUARES, SQUARE_NUMBERS, DraughtsEngine
+from app.models.models import Game, GameStatus, MoveRecord
+
+
+# Columns replay reads, all held by the replay index
+REPLAY_COLUMNS = (
+    MoveRecord.ply,
+    MoveRecord.player,
+    MoveRecord.from_square,
+    MoveRecord.to_square,
+    MoveRecord.path,
+    MoveRecord.captures,
+    MoveRecord.clock,
+    MoveRecord.played_at
+)
+
+
+def format_squares(squares: Iterable) -> Optional[str]:
+    """Squares as their numbers, e.g. "15,24"; None if there are none."""
+    return ",".join(str(SQUARE_NUMBERS[tuple(square)]) for square in squares) or None
+
+
+def parse_squares(numbers: Optional[str]) -> List[Tuple[int, int]]:
+    """The (row, col) squares of a list of square numbers."""
+    return [SQUARES[int(number) - 1] for number in numbers.split(",")] if numbers else []
+
+
+def move_record(game_id: int, move: dict) -> MoveRecord:
+    """
+    The game_moves row of a move: an engine move_history record with its
+    ply and, when logged live, the mover's clock and an ISO played_at.
+    """
+    played_at = move.get("played_at")
+    return MoveRecord(
+        game_id=game_id,
+        ply=move["ply"],
+        player=move["player"],
+        from_square=SQUARE_NUMBERS[tuple(move["from"])],
+        to_square=SQUARE_NUMBERS[tuple(move["to"])],
+        path=format_squares(move.get("path", [])),
+        captures=format_squares(move.get("captured", [])),
+        clock=move.get("clock"),
+        played_at=datetime.fromisoformat(played_at) if played_at else None
+    )
+
+
+def move_entry(row) -> dict:
+    """A game_moves row as a move_history record with its ply, clock and played_at."""
+    captured = parse_squares(row.captures)
+    return {
+        "ply": row.ply,
+        "player": row.player,
+        "from": SQUARES[row.from_square - 1],
+        "to": SQUARES[row.to_square - 1],
+        "capture": bool(captured),
+        "path": parse_squares(row.path),
+        "captured": captured,
+        "clock": row.clock,
+        "played_at": row.played_at.isoformat() if row.played_at else None
+    }
+
+
+def iter_moves(
+    db: Session,
+    game_id: int,
+    from_ply: int = 1,
+    to_ply: Optional[int] = None,
+    batch_size: int = 500
+) -> Iterator[dict]:
+    """
+    A game's stored moves in ply order, read along the replay index in
+    batches of batch_size rows rather than all at once.
+    """
+    query = db.query(*REPLAY_COLUMNS).filter(MoveRecord.game_id == game_id, MoveRecord.ply >= from_ply)
+    if to_ply is not None:
+        query = query.filter(MoveRecord.ply <= to_ply)
+    for row in query.order_by(MoveRecord.ply).yield_per(batch_size):
+        yield move_entry(row)
+
+
+def play_legacy_move(engine: DraughtsEngine, move: dict) -> bool:
+    """
+    Play a move recorded before captures were chained: a step or a single
+    jump, after which the turn passed even if the piece could jump again,
+    and not always the capture the rules now force. False if the move does
+    not fit the board even so.
+    """
+    if move["path"]:
+        return False
+    (from_row, from_col), (to_row, to_col) = move["from"], move["to"]
+    if not engine.is_valid_position(from_row, from_col) or not engine.is_valid_position(to_row, to_col):
+        return False
+    piece = engine.board[from_row][from_col]
+    if abs(piece) != engine.current_player or engine.board[to_row][to_col] != 0:
+        return False
+    
+    rows, cols = to_row - from_row, to_col - from_col
+    if abs(rows) != abs(cols) or abs(rows) not in (1, 2):
+        return False
+    if abs(rows) == 1:
+        # Men step forward only
+        if piece == 1 and rows > 0 or piece == 2 and rows < 0:
+            return False
+    else:
+        jumped = engine.board[from_row + rows // 2][from_col + cols // 2]
+        if jumped == 0 or abs(jumped) == engine.current_player:
+            return False
+    
+    engine.push_move(((from_row, from_col), (to_row, to_col)))
+    return True
+
+
+def replay(moves: Iterable[dict], ply: Optional[int] = None) -> DraughtsEngine:
+    """
+    An engine at the position after a ply, or after every move, of a game
+    from the start. Moves are consumed only up to the ply. Moves of games
+    migrated from move_history that the current rules reject are played
+    as the rules stood then (play_legacy_move).
+    Raises ValueError if a move cannot be played.
+    """
+    engine = DraughtsEngine()
+    for move in moves:
+        if ply is not None and move["ply"] > ply:
+            break
+        if move["ply"] != len(engine.move_history) + 1 or not (
+            engine.make_move(move["from"], move["to"], move["path"]) or play_legacy_move(engine, move)
+        ):
+            raise ValueError(f"Move {move['ply']} cannot be replayed")
+    return engine
+
+
+def migrate_game(db: Session, game: Game) -> int:
+    """
+    Copy a game's legacy move_history array into game_moves, unless it has
+    rows there already. The history is replayed first, so only games whose
+    positions can be shown are copied. Returns the rows added; the caller
+    commits. Raises ValueError if the history cannot be replayed.
+    """
+    if not game.move_history:
+        return 0
+    if db.query(MoveRecord.id).filter(MoveRecord.game_id == game.id).first() is not None:
+        return 0
+    moves = [
+        dict(move, ply=ply, path=[tuple(square) for square in move.get("path") or []])
+        for ply, move in enumerate(game.move_history, 1)
+    ]
+    replay(moves)
+    for move in moves:
+        db.add(move_record(game.id, move))
+    return len(moves)
+
+
+def migrate_games(
+    db: Session,
+    status: Optional[GameStatus] = None,
+    batch_size: int = 200
+) -> Tuple[int, int, List[int]]:
+    """
+    Migrate every game, or those with a status, committing every batch_size
+    games. Returns (games migrated, rows added, games whose history cannot
+    be replayed and was left out).
+    """
+    query = db.query(Game.id)
+    if status is not None:
+        query = query.filter(Game.status == status)
+    game_ids = [game_id for game_id, in query.order_by(Game.id)]
+    
+    games = rows = 0
+    skipped = []
+    for start in range(0, len(game_ids), batch_size):
+        batch = db.query(Game).filter(Game.id.in_(game_ids[start:start + batch_size])).all()
+        for game in batch:
+            try:
+                added = migrate_game(db, game)
+            except ValueError:
+                skipped.append(game.id)
+                continue
+            games += bool(added)
+            rows += added
+        db.commit()
+        db.expunge_all()
+    return games, rows, skipped
+
+
+def main():
+    """Copy the move_history arrays of existing games into the game_moves table."""
+    import argparse
+    from app.db.database import Base, SessionLocal, engine
+    
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--batch-size", type=int, default=200, help="Games per transaction")
+    args = parser.parse_args()
+    
+    Base.metadata.create_all(bind=engine, tables=[MoveRecord.__table__])
+    db = SessionLocal()
+    try:
+        games, rows, skipped = migrate_games(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"{games} games migrated, {rows} moves")
+    if skipped:
+        print(f"{len(skipped)} games left out, their moves cannot be replayed: {', '.join(map(str, skipped))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,22 @@
-from sqlalchemy.orm import Session
-from typing import Optional, Tuple
+from sqlalchemy.orm import Session, load_only
+from typing import Iterator, List, Optional, Tuple
 from app.models.models import Game, User, Transaction, GameMode, GameStatus, TransactionType
+from app.db.database import SessionLocal
 from app.games.draughts_engine import DraughtsEngine
-from app.games.draughts_ai import DraughtsAI
+from app.services.ai_executor import AIExecutor, discard_table
+from app.services.game_clock import flag_scheduler
+from app.services.game_events import game_events
+from app.services import game_clock
+from app.services.game_moves import iter_moves, migrate_games
+from app.services.game_store import LiveGame, game_store
 from app.core.config import settings
+from datetime import datetime
+import asyncio
 import uuid
 
+# AI replies running in the background; asyncio holds tasks only weakly
+ai_reply_tasks = set()
+
 
 class GameService:
     """Service for managing game logic and state."""
@@ -65,7 +76,7 @@ class GameService:
         
         # Initialize game board
         engine = DraughtsEngine()
-        game.board_state = engine.get_board_state()
+        game.board_state = engine.get_board_state(compact=True)
         
         db.add(game)
         db.commit()
@@ -109,7 +120,7 @@ class GameService:
         
         # Initialize game board
         engine = DraughtsEngine()
-        game.board_state = engine.get_board_state()
+        game.board_state = engine.get_board_state(compact=True)
         
         db.add(game)
         db.commit()
@@ -118,73 +129,471 @@ class GameService:
         return game
     
     @staticmethod
-    def make_move(
-        db: Session, 
-        game_id: int, 
-        user_id: int, 
-        from_pos: Tuple[int, int], 
-        to_pos: Tuple[int, int]
+    async def make_move_async(
+        db: Session,
+        game_id: int,
+        user_id: int,
+        from_pos: Tuple[int, int],
+        to_pos: Tuple[int, int],
+        executor: AIExecutor,
+        wait_for_ai: bool = True,
+        path: Optional[List[Tuple[int, int]]] = None
     ) -> Tuple[bool, Optional[str], Optional[dict]]:
         """
-        Make a move in a game.
+        Make a move in a game, awaiting the AI's reply from an AI executor
+        so the event loop is never blocked by the search.
+        With wait_for_ai=False the move is committed with the game marked
+        ai_thinking and the caller must schedule play_ai_reply.
         Returns (success, error_message, updated_board_state)
         """
+        game, live, error = await asyncio.to_thread(
+            GameService.play_move, db, game_id, user_id, from_pos, to_pos, path
+        )
+        
+        if error:
+            return False, error, None
+        
+        engine = live.engine
+        first_ply = len(engine.move_history) - 1
+        if GameService.needs_ai_move(game):
+            if wait_for_ai:
+                ai_move = await GameService.search_ai_move(executor, game, engine.get_board_state(compact=True))
+                if not await asyncio.to_thread(GameService.play_ai_move, db, game, live, ai_move):
+                    # Left to play_ai_reply, which searches the position again
+                    live = await asyncio.to_thread(game_store.load, game)
+                    engine = live.engine
+                    game.ai_thinking = engine.current_player == 2
+            else:
+                game.ai_thinking = True
+        
+        def commit():
+            board_state = engine.get_board_state(compact=True)
+            events = GameService.update_events(game, engine.move_history, first_ply)
+            db.commit()
+            game_store.committed(game.id)
+            GameService.publish(game.id, events)
+            flag_scheduler.schedule_game(game)
+            return board_state
+        
+        return True, None, await asyncio.to_thread(commit)
+    
+    @staticmethod
+    def play_move(
+        db: Session,
+        game_id: int,
+        user_id: int,
+        from_pos: Tuple[int, int],
+        to_pos: Tuple[int, int],
+        path: Optional[List[Tuple[int, int]]] = None
+    ) -> Tuple[Optional[Game], Optional[LiveGame], Optional[str]]:
+        """
+        Validate and play a player's move on the game's resident engine,
+        charging the mover's clock and logging the move in the live game
+        store, without committing. A move after the mover's clock has
+        fallen ends the game on time instead.
+        A capture chain is one move: to_pos is where it ends and path the
+        squares landed on in between (needed only if ambiguous).
+        Returns (game, live_game, error_message)
+        """
         game = db.query(Game).filter(Game.id == game_id).first()
         
         if not game:
-            return False, "Game not found", None
+            return None, None, "Game not found"
         
         if game.status != GameStatus.IN_PROGRESS:
-            return False, "Game is not in progress", None
+            return None, None, "Game is not in progress"
         
-        if game.current_turn != user_id:
-            return False, "Not your turn", None
+        live = game_store.load(game)
+        with live.lock:
+            engine = live.engine
+            GameService.sync_turn(game, engine)
+            
+            now = datetime.utcnow()
+            left = game_clock.time_left(game, now)
+            if left is not None and left <= 0 and GameService.check_flag(db, game, live):
+                return None, None, "Time has run out"
+            
+            if game.current_turn != user_id:
+                return None, None, "Not your turn"
+            
+            if game.ai_thinking:
+                return None, None, "AI is still thinking"
+            
+            # Make the move
+            if not engine.make_move(from_pos, to_pos, path):
+                return None, None, "Invalid move"
+            
+            game_clock.charge(game, now)
+            if not game_store.record(game, live):
+                return None, None, "The game has changed, reload it"
+            
+            # Check if game is over
+            is_over, winner = engine.is_game_over()
+            
+            if is_over:
+                GameService.end_game(db, game, winner)
+                return game, live, None
+            
+            if game_store.needs_flush(live):
+                game_store.flush(db, game, live)
+            
+            if game.mode == GameMode.VS_PLAYER:
+                # Switch to other player
+                game.current_turn = game.player2_id if game.current_turn == game.player1_id else game.player1_id
         
-        # Load game engine
-        engine = DraughtsEngine()
-        engine.set_board_state(game.board_state)
+        return game, live, None
+    
+    @staticmethod
+    def sync_turn(game: Game, engine: DraughtsEngine):
+        """
+        Set whose turn it is from the resident engine, which may be ahead of
+        the games row after a crash or a move made by another API process.
+        """
+        if game.mode == GameMode.VS_PLAYER:
+            game.current_turn = game.player1_id if engine.current_player == 1 else game.player2_id
+        elif engine.current_player == 2:
+            game.ai_thinking = True
+    
+    @staticmethod
+    def needs_ai_move(game: Game) -> bool:
+        """Check if the AI is to reply in a game."""
+        return game.mode == GameMode.VS_AI and game.status == GameStatus.IN_PROGRESS
+    
+    @staticmethod
+    def play_ai_move(db: Session, game: Game, live: LiveGame, ai_move) -> bool:
+        """
+        Play the AI's reply, without committing it. Returns False, leaving
+        the game as it was, if the move cannot be played on the current
+        position or another API process has already played that ply.
+        """
+        with live.lock:
+            engine = live.engine
+            if ai_move is not None:
+                if not engine.make_move(ai_move[0], ai_move[-1], list(ai_move[1:-1])):
+                    return False
+                if not game_store.record(game, live):
+                    return False
+            
+            # Check again if game is over after AI move
+            is_over, winner = engine.is_game_over()
+            if is_over:
+                GameService.end_game(db, game, winner)
+            else:
+                if game_store.needs_flush(live):
+                    game_store.flush(db, game, live)
+                game.current_turn = game.player1_id
+        return True
+    
+    @staticmethod
+    async def search_ai_move(executor: AIExecutor, game: Game, board_state: dict):
+        """The AI's move in a position, from the executor's shallow fallback search if the full one fails."""
+        try:
+            return await executor.get_best_move(game.id, board_state, game.ai_difficulty)
+        except Exception:
+            return await executor.get_fallback_move(board_state, game.ai_difficulty)
+    
+    @staticmethod
+    async def play_ai_reply(game_id: int, executor: AIExecutor, retry: bool = True):
+        """
+        Search and commit the AI's reply in a game marked ai_thinking.
+        Runs in the background with its own database session. A reply that
+        cannot be played, because the position changed during the search,
+        is searched once more.
+        """
+        db = SessionLocal()
+        try:
+            def load():
+                game = db.query(Game).filter(Game.id == game_id).first()
+                if not game or not game.ai_thinking or game.status != GameStatus.IN_PROGRESS:
+                    return None, None
+                live = game_store.load(game)
+                with live.lock:
+                    return game, live.engine.get_board_state(compact=True)
+            
+            game, board_state = await asyncio.to_thread(load)
+            if game is None:
+                return
+            
+            ai_move = await GameService.search_ai_move(executor, game, board_state)
+            
+            def commit():
+                # The game may have been forfeited while the AI was thinking
+                db.refresh(game)
+                events = []
+                if game.ai_thinking and game.status == GameStatus.IN_PROGRESS:
+                    live = game_store.load(game)
+                    first_ply = live.plies
+                    if not GameService.play_ai_move(db, game, live, ai_move):
+                        db.rollback()
+                        return False
+                    game.ai_thinking = False
+                    events = GameService.update_events(game, live.engine.move_history, first_ply)
+                game.ai_thinking = False
+                db.commit()
+                game_store.committed(game_id)
+                GameService.publish(game_id, events)
+                return True
+            
+            played = await asyncio.to_thread(commit)
+        finally:
+            db.close()
         
-        # Make the move
-        if not engine.make_move(from_pos, to_pos):
-            return False, "Invalid move", None
+        if not played and retry:
+            await GameService.play_ai_reply(game_id, executor, retry=False)
+    
+    @staticmethod
+    def start_ai_reply(game_id: int, executor: AIExecutor):
+        """Play the AI's reply in a game marked ai_thinking in the background."""
+        task = asyncio.create_task(GameService.play_ai_reply(game_id, executor))
+        ai_reply_tasks.add(task)
+        task.add_done_callback(ai_reply_tasks.discard)
+    
+    @staticmethod
+    async def resume_ai_replies(executor: AIExecutor):
+        """Play the AI replies left pending when the server last stopped."""
+        def pending_games():
+            db = SessionLocal()
+            try:
+                games = db.query(Game.id).filter(
+                    Game.ai_thinking == True,
+                    Game.status == GameStatus.IN_PROGRESS
+                ).all()
+                return [game_id for game_id, in games]
+            finally:
+                db.close()
         
-        # Update game state
-        game.board_state = engine.get_board_state()
-        game.move_history = engine.move_history
+        for game_id in await asyncio.to_thread(pending_games):
+            GameService.start_ai_reply(game_id, executor)
+    
+    @staticmethod
+    def check_flag(db: Session, game: Game, live: LiveGame) -> bool:
+        """
+        End a game on time if its running clock has fallen, or schedule the
+        fall otherwise (a move may have reset the clock). The row is
+        reloaded and locked, so a game is ended once however many API
+        processes check it. Hold the game's LiveGame lock.
+        Returns whether the game is over.
+        """
+        db.refresh(game, with_for_update=True)
+        if game.status != GameStatus.IN_PROGRESS:
+            return True
         
-        # Check if game is over
-        is_over, winner = engine.is_game_over()
+        GameService.sync_turn(game, live.engine)
+        left = game_clock.time_left(game, datetime.utcnow())
+        if left is None or left > 0:
+            flag_scheduler.schedule_game(game)
+            return False
         
-        if is_over:
-            GameService.end_game(db, game, winner)
+        # The player to move loses on time
+        if game_clock.mover(game) == 1:
+            game.player1_time_left, winner = 0, 2
         else:
-            # Update current turn
-            if game.mode == GameMode.VS_AI:
-                # AI makes a move
-                ai = DraughtsAI(game.ai_difficulty)
-                ai.make_move(engine)
-                game.board_state = engine.get_board_state()
-                game.move_history = engine.move_history
+            game.player2_time_left, winner = 0, 1
+        GameService.end_game(db, game, winner)
+        GameService.publish(game.id, GameService.update_events(game, [], 0))
+        return True
+    
+    @staticmethod
+    def flag_games(game_ids: List[int]):
+        """End the games whose clock has fallen, from the flag scheduler."""
+        db = SessionLocal()
+        try:
+            for game_id in game_ids:
+                game = db.query(Game).filter(Game.id == game_id).first()
+                if not game or game.status != GameStatus.IN_PROGRESS:
+                    continue
+                live = game_store.load(game)
+                with live.lock:
+                    GameService.check_flag(db, game, live)
+                # Release the row lock of a game still in progress
+                db.commit()
+        finally:
+            db.close()
+    
+    @staticmethod
+    def schedule_clocks():
+        """Schedule the clocks of the timed games in progress, when the server starts."""
+        db = SessionLocal()
+        try:
+            games = db.query(Game).options(load_only(
+                Game.id,
+                Game.mode,
+                Game.status,
+                Game.player1_id,
+                Game.current_turn,
+                Game.player1_time_left,
+                Game.player2_time_left,
+                Game.last_move_time
+            )).filter(
+                Game.status == GameStatus.IN_PROGRESS,
+                Game.mode == GameMode.VS_PLAYER,
+                Game.last_move_time != None
+            )
+            for game in games.yield_per(1000):
+                flag_scheduler.schedule_game(game)
+        finally:
+            db.close()
+    
+    @staticmethod
+    def flush_games():
+        """
+        Write the logged moves of every game to the database: at startup
+        to recover the moves made before a crash (with the Redis move log),
+        at shutdown so none are lost (with the in-memory one).
+        """
+        db = SessionLocal()
+        try:
+            for game_id in game_store.logged():
+                game = db.query(Game).filter(Game.id == game_id).first()
+                if not game or game.status != GameStatus.IN_PROGRESS:
+                    # Ended, and the row holds every move
+                    game_store.discard(game_id)
+                    continue
                 
-                # Check again if game is over after AI move
-                is_over, winner = engine.is_game_over()
-                if is_over:
-                    GameService.end_game(db, game, winner)
-                else:
-                    game.current_turn = user_id
-            else:
-                # Switch to other player
-                game.current_turn = game.player2_id if game.current_turn == game.player1_id else game.player1_id
+                live = game_store.load(game)
+                with live.lock:
+                    GameService.sync_turn(game, live.engine)
+                    is_over, winner = live.engine.is_game_over()
+                    if is_over:
+                        GameService.end_game(db, game, winner)
+                        continue
+                    game_store.flush(db, game, live)
+                db.commit()
+                game_store.committed(game_id)
+        finally:
+            db.close()
+    
+    @staticmethod
+    def migrate_live_games():
+        """Copy the legacy move_history of in-progress games into game_moves so they can go on."""
+        db = SessionLocal()
+        try:
+            migrate_games(db, GameStatus.IN_PROGRESS)
+        finally:
+            db.close()
+    
+    @staticmethod
+    def iter_game_moves(
+        db: Session,
+        game_id: int,
+        in_progress: bool,
+        from_ply: int = 1,
+        to_ply: Optional[int] = None
+    ) -> Iterator[dict]:
+        """
+        A game's moves in ply order, streamed from game_moves and followed,
+        for a game in progress, by the logged moves not flushed there yet.
+        """
+        last_ply = from_ply - 1
+        for move in iter_moves(db, game_id, from_ply, to_ply):
+            last_ply = move["ply"]
+            yield move
         
-        db.commit()
-        db.refresh(game)
+        if in_progress:
+            for move in game_store.logged_moves(game_id, last_ply):
+                if to_ply is not None and move["ply"] > to_ply:
+                    break
+                yield move
+    
+    @staticmethod
+    def get_game(db: Session, game_id: int) -> Optional[Game]:
+        """
+        Get a game for reading. An in-progress game's position is taken from
+        the live game store, as the database may not hold the latest moves
+        yet; do not commit the session afterwards.
+        """
+        game = db.query(Game).filter(Game.id == game_id).first()
+        if game:
+            GameService.apply_live_state(game)
+        return game
+    
+    @staticmethod
+    def apply_live_state(game: Game) -> Game:
+        """Bring an in-progress game's position and turn up to date from the live game store."""
+        if game.status == GameStatus.IN_PROGRESS:
+            live = game_store.load(game)
+            with live.lock:
+                game.board_state = live.engine.get_board_state(compact=True)
+                GameService.sync_turn(game, live.engine)
+        return game
+    
+    @staticmethod
+    def state_event(game: Game) -> dict:
+        """A game's full state, as sent to WebSocket clients when they connect."""
+        return {
+            "type": "state",
+            "game_id": game.id,
+            "status": game.status.value if game.status else None,
+            "board_state": game.board_state,
+            "plies": game_store.stored_plies(game),
+            "player1_id": game.player1_id,
+            "player2_id": game.player2_id,
+            "current_turn": game.current_turn,
+            "ai_thinking": bool(game.ai_thinking),
+            "player1_time_left": game.player1_time_left,
+            "player2_time_left": game.player2_time_left,
+            "last_move_time": game.last_move_time.isoformat() if game.last_move_time else None,
+            "winner_id": game.winner_id,
+            "is_draw": bool(game.is_draw)
+        }
+    
+    @staticmethod
+    def update_events(game: Game, history: list, first_ply: int) -> List[dict]:
+        """
+        The WebSocket events of an update to a game: a move delta for each
+        move of history from first_ply on, then the turn and clocks, then the
+        result if the game has ended. Built before the update is committed
+        and published after, so the game need not be reloaded.
+        """
+        events = []
+        for ply in range(first_ply, len(history)):
+            move = history[ply]
+            events.append({
+                "type": "move",
+                "game_id": game.id,
+                "ply": ply + 1,
+                "player": move["player"],
+                "from": move["from"],
+                "to": move["to"],
+                "path": move.get("path", []),
+                "captured": move.get("captured", [])
+            })
+        
+        events.append({
+            "type": "clock",
+            "game_id": game.id,
+            "current_turn": game.current_turn,
+            "ai_thinking": bool(game.ai_thinking),
+            "player1_time_left": game.player1_time_left,
+            "player2_time_left": game.player2_time_left,
+            "last_move_time": game.last_move_time.isoformat() if game.last_move_time else None
+        })
         
-        return True, None, game.board_state
+        if game.status == GameStatus.COMPLETED:
+            events.append({
+                "type": "game_over",
+                "game_id": game.id,
+                "winner_id": game.winner_id,
+                "is_draw": bool(game.is_draw)
+            })
+        
+        return events
+    
+    @staticmethod
+    def publish(game_id: int, events: List[dict]):
+        """Publish committed events to a game's WebSocket clients."""
+        for event in events:
+            game_events.publish(game_id, event)
     
     @staticmethod
     def end_game(db: Session, game: Game, winner: Optional[int]):
         """End a game and distribute winnings."""
         game.status = GameStatus.COMPLETED
+        discard_table(game.id)
+        flag_scheduler.cancel(game.id)
+        
+        # Write the moves the games row does not hold yet
+        game_store.flush(db, game, game_store.load(game))
         
         if winner is None:
             # Draw - return bets to players
@@ -195,58 +604,57 @@ class GameService:
             if game.player2_id:
                 player2 = db.query(User).filter(User.id == game.player2_id).first()
                 player2.balance += game.bet_amount
-            
+        
         else:
             # Someone won
             game.winner_id = game.player1_id if winner == 1 else game.player2_id
             
-            total_pot = game.bet_amount * 2 if game.mode == GameMode.VS_PLAYER else game.bet_amount
-            commission = GameService.calculate_commission(total_pot)
-            winnings = total_pot - commission
-            
-            game.commission_amount = commission
-            
-            # Update winner's balance
-            winner_user = db.query(User).filter(User.id == game.winner_id).first()
-            winner_user.balance += winnings
-            winner_user.games_won += 1
-            
-            # Create transaction for winner
-            Transaction(
-                user_id=game.winner_id,
-                type=TransactionType.GAME_WIN,
-                amount=winnings,
-                balance_before=winner_user.balance - winnings,
-                balance_after=winner_user.balance,
-                game_id=game.id,
-                payment_reference=f"GAME_WIN_{game.id}_{uuid.uuid4().hex[:8]}",
-                payment_status="completed",
-                description=f"Won game #{game.id}"
-            )
+            if game.winner_id is None:
+                # The AI won; the bet stays with the house
+                player1 = db.query(User).filter(User.id == game.player1_id).first()
+                player1.games_lost += 1
             
-            # Update loser stats
-            if game.mode == GameMode.VS_PLAYER:
-                loser_id = game.player2_id if game.winner_id == game.player1_id else game.player1_id
-                loser_user = db.query(User).filter(User.id == loser_id).first()
-                loser_user.games_lost += 1
+            else:
+                total_pot = game.bet_amount * 2 if game.mode == GameMode.VS_PLAYER else game.bet_amount
+                commission = GameService.calculate_commission(total_pot)
+                winnings = total_pot - commission
                 
-                # Update ELO ratings
-                winner_new_rating, loser_new_rating = GameService.calculate_elo_change(
-                    winner_user.rating, loser_user.rating
-                )
+                game.commission_amount = commission
                 
-                game.player1_rating_after = winner_new_rating if game.winner_id == game.player1_id else loser_new_rating
-                game.player2_rating_after = loser_new_rating if game.winner_id == game.player1_id else winner_new_rating
+                # Update winner's balance
+                winner_user = db.query(User).filter(User.id == game.winner_id).first()
+                winner_user.balance += winnings
+                winner_user.games_won += 1
                 
-                winner_user.rating = winner_new_rating
-                loser_user.rating = loser_new_rating
-            else:
-                # AI opponent
-                player1 = db.query(User).filter(User.id == game.player1_id).first()
-                if game.winner_id == game.player1_id:
-                    player1.games_won += 1
-                else:
-                    player1.games_lost += 1
+                # Create transaction for winner
+                Transaction(
+                    user_id=game.winner_id,
+                    type=TransactionType.GAME_WIN,
+                    amount=winnings,
+                    balance_before=winner_user.balance - winnings,
+                    balance_after=winner_user.balance,
+                    game_id=game.id,
+                    payment_reference=f"GAME_WIN_{game.id}_{uuid.uuid4().hex[:8]}",
+                    payment_status="completed",
+                    description=f"Won game #{game.id}"
+                )
+                
+                # Update loser stats
+                if game.mode == GameMode.VS_PLAYER:
+                    loser_id = game.player2_id if game.winner_id == game.player1_id else game.player1_id
+                    loser_user = db.query(User).filter(User.id == loser_id).first()
+                    loser_user.games_lost += 1
+                    
+                    # Update ELO ratings
+                    winner_new_rating, loser_new_rating = GameService.calculate_elo_change(
+                        winner_user.rating, loser_user.rating
+                    )
+                    
+                    game.player1_rating_after = winner_new_rating if game.winner_id == game.player1_id else loser_new_rating
+                    game.player2_rating_after = loser_new_rating if game.winner_id == game.player1_id else winner_new_rating
+                    
+                    winner_user.rating = winner_new_rating
+                    loser_user.rating = loser_new_rating
         
         # Update total games
         player1 = db.query(User).filter(User.id == game.player1_id).first()
@@ -257,3 +665,4 @@ class GameService:
             player2.total_games += 1
         
         db.commit()
+        game_store.discard(game.id)
@@ -0,0 +1,285 @@
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session, object_session
+from app.core.config import settings
+from app.games.draughts_engine import DraughtsEngine
+from app.models.models import Game
+from app.services.ai_executor import legal_move_cache, tablebase
+from app.services.game_moves import iter_moves, move_record
+
+try:
+    import redis
+except ImportError:  # Redis is optional; only GAME_STORE=redis needs it
+    redis = None
+
+
+class MemoryMoveLog:
+    """
+    Moves not yet flushed to the database, kept in this process. They
+    are lost if the process dies, so a crash loses up to GAME_FLUSH_MOVES - 1
+    plies of a game.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.logs: Dict[int, List[dict]] = {}
+    
+    def append(self, game_id: int, move: dict) -> bool:
+        """Append a move; False if the log's last move is not the ply before it."""
+        with self.lock:
+            log = self.logs.setdefault(game_id, [])
+            if log and log[-1]["ply"] != move["ply"] - 1:
+                return False
+            log.append(move)
+            return True
+    
+    def read(self, game_id: int, after_ply: int) -> List[dict]:
+        """The logged moves after a ply, in order."""
+        with self.lock:
+            return [move for move in self.logs.get(game_id, ()) if move["ply"] > after_ply]
+    
+    def trim(self, game_id: int, ply: int):
+        """Drop the moves up to a ply, once they are flushed."""
+        with self.lock:
+            log = [move for move in self.logs.get(game_id, ()) if move["ply"] > ply]
+            if log:
+                self.logs[game_id] = log
+            else:
+                self.logs.pop(game_id, None)
+    
+    def discard(self, game_id: int):
+        """Drop a game's log."""
+        with self.lock:
+            self.logs.pop(game_id, None)
+    
+    def games(self) -> List[int]:
+        """Games with moves not yet flushed."""
+        with self.lock:
+            return list(self.logs)
+
+
+class RedisMoveLog:
+    """
+    Moves not yet flushed to the database, kept in Redis lists. They
+    survive an API crash, to be replayed at the next startup, and are
+    shared by every API process.
+    """
+    
+    GAMES_KEY = "draughts:live_games"
+    
+    # Append only on top of the ply before, so two processes cannot both play a ply
+    APPEND_SCRIPT = """
+        local last = redis.call('LINDEX', KEYS[1], -1)
+        if last and cjson.decode(last)['ply'] ~= tonumber(ARGV[1]) - 1 then
+            return 0
+        end
+        redis.call('RPUSH', KEYS[1], ARGV[2])
+        redis.call('SADD', KEYS[2], ARGV[3])
+        return 1
+    """
+    
+    TRIM_SCRIPT = """
+        while true do
+            local first = redis.call('LINDEX', KEYS[1], 0)
+            if not first or cjson.decode(first)['ply'] > tonumber(ARGV[1]) then
+                break
+            end
+            redis.call('LPOP', KEYS[1])
+        end
+        if redis.call('LLEN', KEYS[1]) == 0 then
+            redis.call('SREM', KEYS[2], ARGV[2])
+        end
+    """
+    
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("GAME_STORE=redis needs the redis package")
+        if not url:
+            raise RuntimeError("GAME_STORE=redis needs REDIS_URL")
+        self.client = redis.Redis.from_url(url)
+        self.append_script = self.client.register_script(self.APPEND_SCRIPT)
+        self.trim_script = self.client.register_script(self.TRIM_SCRIPT)
+    
+    @staticmethod
+    def key(game_id: int) -> str:
+        return f"draughts:moves:{game_id}"
+    
+    def append(self, game_id: int, move: dict) -> bool:
+        """Append a move; False if the log's last move is not the ply before it."""
+        keys = [self.key(game_id), self.GAMES_KEY]
+        return bool(self.append_script(keys=keys, args=[move["ply"], json.dumps(move), game_id]))
+    
+    def read(self, game_id: int, after_ply: int) -> List[dict]:
+        """The logged moves after a ply, in order."""
+        moves = [json.loads(move) for move in self.client.lrange(self.key(game_id), 0, -1)]
+        return [move for move in moves if move["ply"] > after_ply]
+    
+    def trim(self, game_id: int, ply: int):
+        """Drop the moves up to a ply, once they are flushed."""
+        self.trim_script(keys=[self.key(game_id), self.GAMES_KEY], args=[ply, game_id])
+    
+    def discard(self, game_id: int):
+        """Drop a game's log."""
+        pipeline = self.client.pipeline()
+        pipeline.delete(self.key(game_id))
+        pipeline.srem(self.GAMES_KEY, game_id)
+        pipeline.execute()
+    
+    def games(self) -> List[int]:
+        """Games with moves not yet flushed."""
+        return [int(game_id) for game_id in self.client.smembers(self.GAMES_KEY)]
+
+
+class LiveGame:
+    """The engine of an in-progress game, kept resident between moves."""
+    
+    def __init__(self, engine: DraughtsEngine, flushed_plies: int):
+        self.engine = engine
+        self.flushed_plies = flushed_plies  # Plies the games row holds
+        self.flushing: Optional[int] = None  # Plies written to the row, not yet committed
+        self.lock = threading.RLock()  # Held while the engine is used
+    
+    @property
+    def plies(self) -> int:
+        return len(self.engine.move_history)
+    
+    @property
+    def written_plies(self) -> int:
+        """Plies the games row holds once the pending flush, if any, is committed."""
+        return self.flushing if self.flushing is not None else self.flushed_plies
+
+
+class GameStore:
+    """
+    Engines of in-progress games, kept resident so a move does not rebuild
+    the position from the database. Each move is appended to a move log;
+    only every flush_moves plies and when the game ends are the logged
+    moves inserted into game_moves and board_state rewritten. Starting from
+    the stored position and replaying the log gives the current one, which
+    is how a crash is recovered and how an API process catches up with
+    moves made by another.
+    """
+    
+    def __init__(self, log, flush_moves: int):
+        self.log = log
+        self.flush_moves = max(1, flush_moves)
+        self.lock = threading.Lock()
+        self.games: Dict[int, LiveGame] = {}
+    
+    @staticmethod
+    def stored_plies(game: Game) -> int:
+        """Plies the database holds for a game."""
+        return (game.board_state or {}).get("move_count", 0)
+    
+    @staticmethod
+    def engine_from_row(game: Game) -> DraughtsEngine:
+        """An engine at the position stored for a game, with its stored moves."""
+        engine = DraughtsEngine()
+        if game.board_state:
+            engine.set_board_state(game.board_state)
+        engine.move_history = list(iter_moves(object_session(game), game.id))
+        if settings.GAME_TABLEBASE_ADJUDICATION:
+            engine.tablebase = tablebase
+        engine.move_cache = legal_move_cache
+        return engine
+    
+    def load(self, game: Game) -> LiveGame:
+        """
+        The game's resident engine, caught up with its row and move log.
+        Hold the LiveGame's lock while using the engine.
+        """
+        stored_plies = self.stored_plies(game)
+        with self.lock:
+            live = self.games.get(game.id)
+            if live is None or live.plies < stored_plies:
+                live = LiveGame(self.engine_from_row(game), stored_plies)
+                self.games[game.id] = live
+            # Another API process may have flushed
+            live.flushed_plies = max(live.flushed_plies, stored_plies)
+        
+        with live.lock:
+            for move in self.log.read(game.id, live.plies):
+                path = [tuple(square) for square in move["path"]]
+                if move["ply"] != live.plies + 1 or not live.engine.make_move(move["from"], move["to"], path):
+                    break
+        return live
+    
+    def record(self, game: Game, live: LiveGame) -> bool:
+        """
+        Log the engine's last move with the mover's clock. False if the log
+        already has a move for that ply, played by another API process; the
+        resident engine is then dropped, to be rebuilt from the log.
+        """
+        move = live.engine.move_history[-1]
+        move = dict(
+            move,
+            ply=live.plies,
+            clock=game.player1_time_left if move["player"] == 1 else game.player2_time_left,
+            played_at=datetime.now(timezone.utc).isoformat()
+        )
+        if self.log.append(game.id, move):
+            return True
+        self.evict(game.id)
+        return False
+    
+    def logged_moves(self, game_id: int, after_ply: int) -> List[dict]:
+        """A game's logged moves after a ply."""
+        return self.log.read(game_id, after_ply)
+    
+    def needs_flush(self, live: LiveGame) -> bool:
+        return live.plies - live.written_plies >= self.flush_moves
+    
+    def flush(self, db: Session, game: Game, live: LiveGame):
+        """
+        Insert the logged moves into game_moves and write the engine's
+        position to the games row, without committing. Moves written by a
+        flush not committed yet, earlier in the same transaction, are not
+        inserted again.
+        """
+        with live.lock:
+            for move in self.log.read(game.id, live.written_plies):
+                if move["ply"] <= live.plies:
+                    db.add(move_record(game.id, move))
+            game.board_state = live.engine.get_board_state(compact=True)
+            live.flushing = live.plies
+    
+    def committed(self, game_id: int):
+        """Trim the moves a committed flush wrote from the move log."""
+        live = self.games.get(game_id)
+        if live is not None and live.flushing is not None:
+            live.flushed_plies, live.flushing = live.flushing, None
+            self.log.trim(game_id, live.flushed_plies)
+    
+    def evict(self, game_id: int):
+        """Drop a game's resident engine; its move log is kept."""
+        with self.lock:
+            self.games.pop(game_id, None)
+    
+    def discard(self, game_id: int):
+        """Drop an ended game's engine and move log, once the database holds every move."""
+        self.evict(game_id)
+        self.log.discard(game_id)
+    
+    def resident(self) -> List[int]:
+        """Games with a resident engine."""
+        with self.lock:
+            return list(self.games)
+    
+    def logged(self) -> List[int]:
+        """Games with logged moves not yet flushed."""
+        return self.log.games()
+
+
+def create_game_store() -> GameStore:
+    """Build the store selected by the GAME_STORE setting."""
+    if settings.GAME_STORE == "redis":
+        log = RedisMoveLog(settings.REDIS_URL)
+    else:
+        log = MemoryMoveLog()
+    return GameStore(log, settings.GAME_FLUSH_MOVES)
+
+
+# Process-wide live game store
+game_store = create_game_store()
@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class SearchMetrics:
+    """
+    Statistics of the AI searches run for this API process, wherever they
+    ran: totals by difficulty, rendered in the Prometheus text format, and
+    the last search of each game for the debug endpoint. Each API process
+    keeps its own, so scrape every process.
+    """
+    
+    # Search wall time histogram bucket bounds, in seconds
+    BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    # (stats key, metric name, help text) of the counters kept by difficulty
+    COUNTERS = (
+        ("nodes", "draughts_ai_nodes_total", "Nodes searched"),
+        ("cutoffs", "draughts_ai_cutoffs_total", "Alpha-beta cutoffs"),
+        ("tt_probes", "draughts_ai_tt_probes_total", "Transposition table probes"),
+        ("tt_hits", "draughts_ai_tt_hits_total", "Transposition table hits"),
+        ("movegen_seconds", "draughts_ai_movegen_seconds_total", "Seconds spent generating moves"),
+        ("eval_seconds", "draughts_ai_eval_seconds_total", "Seconds spent evaluating positions"),
+        ("depth", "draughts_ai_depth_total", "Sum of the depths reached, for the mean depth"),
+    )
+    
+    def __init__(self, max_games: int = 1024):
+        self.max_games = max_games
+        self.lock = threading.Lock()
+        self.last_searches = OrderedDict()
+        self.totals = {}  # difficulty -> {stats key: total}
+        self.sources = {}  # (difficulty, source) -> moves chosen
+        self.histograms = {}  # difficulty -> [bucket counts..., count, sum]
+    
+    def record(self, game_id: Optional[int], stats: Optional[dict]):
+        """Add a search's statistics; searches without statistics are ignored."""
+        if stats is None:
+            return
+        difficulty = stats["difficulty"]
+        with self.lock:
+            if game_id is not None:
+                self.last_searches[game_id] = stats
+                self.last_searches.move_to_end(game_id)
+                while len(self.last_searches) > self.max_games:
+                    self.last_searches.popitem(last=False)
+            
+            totals = self.totals.setdefault(difficulty, {key: 0 for key, _, _ in self.COUNTERS})
+            for key, _, _ in self.COUNTERS:
+                totals[key] += stats[key]
+            source = (difficulty, stats["source"])
+            self.sources[source] = self.sources.get(source, 0) + 1
+            
+            histogram = self.histograms.setdefault(difficulty, [0] * (len(self.BUCKETS) + 2))
+            for index, bound in enumerate(self.BUCKETS):
+                if stats["seconds"] <= bound:
+                    histogram[index] += 1
+            histogram[-2] += 1
+            histogram[-1] += stats["seconds"]
+    
+    def last_search(self, game_id: int) -> Optional[dict]:
+        """Statistics of the last AI search for a game, if any were recorded."""
+        with self.lock:
+            return self.last_searches.get(game_id)
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            lines.append("# HELP draughts_ai_moves_total AI moves chosen, by how they were chosen")
+            lines.append("# TYPE draughts_ai_moves_total counter")
+            for (difficulty, source), count in sorted(self.sources.items()):
+                lines.append(f'draughts_ai_moves_total{{difficulty="{difficulty}",source="{source}"}} {count}')
+            
+            for key, name, help_text in self.COUNTERS:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for difficulty, totals in sorted(self.totals.items()):
+                    lines.append(f'{name}{{difficulty="{difficulty}"}} {totals[key]}')
+            
+            name = "draughts_ai_search_seconds"
+            lines.append(f"# HELP {name} AI move choice wall time")
+            lines.append(f"# TYPE {name} histogram")
+            for difficulty, histogram in sorted(self.histograms.items()):
+                for bound, count in zip(self.BUCKETS, histogram):
+                    lines.append(f'{name}_bucket{{difficulty="{difficulty}",le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{difficulty="{difficulty}",le="+Inf"}} {histogram[-2]}')
+                lines.append(f'{name}_count{{difficulty="{difficulty}"}} {histogram[-2]}')
+                lines.append(f'{name}_sum{{difficulty="{difficulty}"}} {histogram[-1]}')
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide search statistics
+search_metrics = SearchMetrics()
@@ -0,0 +1,147 @@
+"""
+Search benchmark for DraughtsAI.
+Runs get_best_move over the fixed opening, middlegame and endgame corpus
+at each difficulty and reports nodes, nodes per second, cutoffs, depth
+reached, wall time and p50/p95/p99 latency per difficulty and phase.
+Random moves are switched off and every search gets a fresh
+transposition table, so runs on the same machine are comparable. The full
+results, every search included, are written as JSON for comparing runs
+across commits.
+
+Searches run on BitboardEngine, as the AI executor's do; --engine draughts
+times the same searches on DraughtsEngine.
+
+Usage: python benchmarks/ai_search.py [--difficulty hard] [--repeat 3]
+       [--time-budget 0.5 | --fixed-depth] [--engine draughts] [--output results.json]
+"""
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from positions import CORPUS
+from app.core.config import settings
+from app.games.draughts_ai import DraughtsAI
+from app.games.perft import ENGINES, load_position
+
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def search(fen: str, difficulty: str, time_budget, engine_name: str):
+    engine = load_position(fen, engine_name)
+    ai = DraughtsAI(difficulty, time_budget=time_budget)
+    ai.random_moves = False
+    start = time.perf_counter()
+    move = ai.get_best_move(engine)
+    elapsed = time.perf_counter() - start
+    return {
+        "position": fen,
+        "move": [list(square) for square in move] if move else None,
+        "score": ai.best_score,
+        "depth": ai.depth_reached,
+        "nodes": ai.nodes,
+        "cutoffs": ai.cutoffs,
+        "seconds": elapsed,
+    }
+
+
+def summarize(searches) -> dict:
+    nodes = sum(result["nodes"] for result in searches)
+    seconds = sum(result["seconds"] for result in searches)
+    latencies = [result["seconds"] for result in searches]
+    return {
+        "searches": len(searches),
+        "nodes": nodes,
+        "cutoffs": sum(result["cutoffs"] for result in searches),
+        "seconds": seconds,
+        "nps": nodes / seconds if seconds > 0 else 0.0,
+        "mean_depth": sum(result["depth"] for result in searches) / len(searches),
+        "latency": {
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies),
+        },
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DraughtsAI over a fixed position corpus.")
+    parser.add_argument("--difficulty", action="append", choices=list(settings.AI_DIFFICULTY_LEVELS),
+                        help="Difficulty to run (repeatable; default all)")
+    parser.add_argument("--phase", action="append", choices=list(CORPUS),
+                        help="Corpus phase to run (repeatable; default all)")
+    parser.add_argument("--repeat", type=int, default=1, help="Searches per position")
+    budget = parser.add_mutually_exclusive_group()
+    budget.add_argument("--time-budget", type=float, help="Seconds per search instead of the difficulty's")
+    budget.add_argument("--fixed-depth", action="store_true", help="Always search to the difficulty's depth")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="bitboard", help="Engine to search on")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout")
+    args = parser.parse_args()
+    
+    difficulties = args.difficulty or list(settings.AI_DIFFICULTY_LEVELS)
+    phases = args.phase or list(CORPUS)
+    time_budget = float("inf") if args.fixed_depth else args.time_budget
+    
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "engine": args.engine,
+        "repeat": args.repeat,
+        "time_budget": "unlimited" if args.fixed_depth else args.time_budget,
+        "difficulties": {},
+    }
+    
+    print(f"{'difficulty':<10} {'phase':<10} {'nodes':>10} {'nps':>10} {'cutoffs':>9} "
+          f"{'depth':>6} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8}", file=sys.stderr)
+    for difficulty in difficulties:
+        by_phase = {}
+        for phase in phases:
+            searches = [
+                search(fen, difficulty, time_budget, args.engine)
+                for fen in CORPUS[phase]
+                for _ in range(args.repeat)
+            ]
+            by_phase[phase] = {**summarize(searches), "results": searches}
+        
+        all_searches = [result for phase in by_phase.values() for result in phase["results"]]
+        report["difficulties"][difficulty] = {**summarize(all_searches), "phases": by_phase}
+        
+        for phase, summary in [*by_phase.items(), ("all", report["difficulties"][difficulty])]:
+            latency = summary["latency"]
+            print(f"{difficulty:<10} {phase:<10} {summary['nodes']:>10} {summary['nps']:>10.0f} "
+                  f"{summary['cutoffs']:>9} {summary['mean_depth']:>6.1f} {latency['p50']:>8.3f} "
+                  f"{latency['p95']:>8.3f} {latency['p99']:>8.3f}", file=sys.stderr)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Benchmark for scoring positions in bulk with NumPy.
+Collects the positions depth plies below each benchmark position, scores
+them one at a time with evaluate_board and all at once with
+BatchEvaluator (timing their encoding too), checks both give the same scores and prints the times.
+Needs NumPy.
+
+Usage: python benchmarks/batch_eval.py [depth]
+"""
+import sys
+import time
+
+from positions import sample_positions
+from app.games.batch_eval import encode_board, load_batch_evaluator
+from app.games.draughts_engine import DraughtsEngine
+
+
+def collect(engine: DraughtsEngine, depth: int, player: int, boards: list, scores: list, timing: list):
+    """Gather the positions depth plies down, timing evaluate_board and encode_board on each."""
+    if depth == 0:
+        start = time.perf_counter()
+        scores.append(engine.evaluate_board(player))
+        encoded = time.perf_counter()
+        boards.append(encode_board(engine.board))
+        timing[0] += encoded - start
+        timing[1] += time.perf_counter() - encoded
+        return
+    for move in engine.get_all_valid_moves_for_player(engine.current_player):
+        engine.push_move(move)
+        collect(engine, depth - 1, player, boards, scores, timing)
+        engine.pop_move()
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    batch_evaluator = load_batch_evaluator()
+    if batch_evaluator is None:
+        print("NumPy is not installed")
+        return 1
+    
+    totals = {False: 0.0, True: 0.0}
+    mismatches = 0
+    
+    print(f"{'position':>8} {'leaves':>10} {'single (s)':>11} {'batched (s)':>12}  same scores")
+    for number, state in enumerate(sample_positions(), 1):
+        engine = DraughtsEngine()
+        engine.set_board_state(state)
+        player = engine.current_player
+        boards, scores, timing = [], [], [0.0, 0.0]
+        collect(engine, depth, player, boards, scores, timing)
+        
+        start = time.perf_counter()
+        batched = batch_evaluator.evaluate(boards, player).tolist() if boards else []
+        elapsed = time.perf_counter() - start + timing[1]
+        
+        same = all(abs(a - b) < 1e-9 for a, b in zip(scores, batched))
+        mismatches += not same
+        totals[False] += timing[0]
+        totals[True] += elapsed
+        print(f"{number:>8} {len(boards):>10} {timing[0]:>11.4f} {elapsed:>12.4f}  {'yes' if same else 'NO'}")
+    
+    print(f"time: {totals[False]:.3f}s single, {totals[True]:.3f}s batched")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Node-count benchmark for DraughtsAI move ordering.
+Searches a fixed set of positions to a fixed depth with move ordering off
+and on (transposition table disabled so only ordering differs), checks
+that both pick the same move and prints the node counts.
+
+Usage: python benchmarks/move_ordering.py [depth]
+"""
+import sys
+import time
+
+from positions import sample_positions
+from app.games.draughts_engine import DraughtsEngine
+from app.games.draughts_ai import DraughtsAI
+
+
+def search(state: dict, depth: int, move_ordering: bool):
+    engine = DraughtsEngine()
+    engine.set_board_state(state)
+    ai = DraughtsAI("expert", time_budget=float("inf"))
+    ai.transposition_table = None
+    ai.max_depth = depth
+    ai.move_ordering = move_ordering
+    start = time.perf_counter()
+    move = ai.get_best_move(engine)
+    return move, ai.nodes, time.perf_counter() - start
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    totals = {False: [0, 0.0], True: [0, 0.0]}
+    mismatches = 0
+    
+    print(f"{'position':>8} {'nodes (off)':>12} {'nodes (on)':>12} {'ratio':>7}  same move")
+    for number, state in enumerate(sample_positions(), 1):
+        results = {}
+        for move_ordering in (False, True):
+            move, nodes, elapsed = search(state, depth, move_ordering)
+            results[move_ordering] = (move, nodes)
+            totals[move_ordering][0] += nodes
+            totals[move_ordering][1] += elapsed
+        same = results[False][0] == results[True][0]
+        mismatches += not same
+        print(f"{number:>8} {results[False][1]:>12} {results[True][1]:>12} "
+              f"{results[False][1] / results[True][1]:>7.2f}  {'yes' if same else 'NO'}")
+    
+    print(f"{'total':>8} {totals[False][0]:>12} {totals[True][0]:>12} "
+          f"{totals[False][0] / totals[True][0]:>7.2f}")
+    print(f"time: {totals[False][1]:.2f}s off, {totals[True][1]:.2f}s on")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
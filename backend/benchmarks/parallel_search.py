@@ -0,0 +1,57 @@
+"""
+Speedup benchmark for the root-split parallel search.
+Searches the benchmark positions to a fixed depth serially and with the
+root moves split across worker processes (transposition tables disabled so
+both searches see the same tree), checks that both pick the same move and
+prints the wall-clock speedup per worker count.
+
+Usage: python benchmarks/parallel_search.py [depth] [workers ...]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from positions import sample_positions
+from app.games.parallel_search import parallel_best_move, search_root_share
+from app.games.draughts_engine import DraughtsEngine
+
+
+def serial_best_move(state: dict, depth: int):
+    engine = DraughtsEngine()
+    engine.set_board_state(state)
+    moves = engine.get_all_valid_moves_for_player(engine.current_player)
+    results, _ = search_root_share(state, "expert", moves, float("inf"), depth)
+    return results[-1][2]
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    worker_counts = [int(arg) for arg in sys.argv[2:]] or [2, 4, os.cpu_count() or 1]
+    positions = sample_positions()
+    
+    start = time.perf_counter()
+    serial_moves = [serial_best_move(state, depth) for state in positions]
+    serial_time = time.perf_counter() - start
+    print(f"serial: {serial_time:.2f}s")
+    
+    mismatches = 0
+    for workers in sorted(set(worker_counts)):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Spawn the workers before timing
+            list(pool.map(abs, range(workers)))
+            start = time.perf_counter()
+            moves = [
+                parallel_best_move(pool, workers, state, "expert", float("inf"), depth)
+                for state in positions
+            ]
+            elapsed = time.perf_counter() - start
+        same = moves == serial_moves
+        mismatches += not same
+        print(f"{workers} workers: {elapsed:.2f}s, speedup {serial_time / elapsed:.2f}x, "
+              f"same moves: {'yes' if same else 'NO'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Fixed benchmark positions shared by the scripts in this directory."""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.games.draughts_engine import DraughtsEngine
+
+
+def sample_positions(count: int = 12, seed: int = 2024):
+    """Positions reached by random play from the start, 6-30 plies in."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        engine = DraughtsEngine()
+        for _ in range(rng.randrange(6, 31)):
+            moves = engine.get_all_valid_moves_for_player(engine.current_player)
+            if not moves:
+                break
+            engine.push_move(rng.choice(moves))
+        if not engine.is_game_over()[0]:
+            positions.append(engine.get_board_state())
+    return positions
+
+
+# Fixed search corpus by game phase, as compact positions (see
+# DraughtsEngine.to_fen). Stored literally so the corpus stays the same
+# whatever changes in move generation.
+CORPUS = {
+    "opening": [
+        "B:W15,21,22,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,10,11,14",
+        "W:W17,22,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,10,11,12,13",
+        "B:W16,21,22,23,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,10,11,12,14",
+        "B:W17,19,21,22,23,25,26,27,28,29,31,32:B1,2,3,4,5,6,7,9,10,11,12,20",
+        "W:W19,21,22,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,10,11,12,14",
+        "W:W17,22,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,9,10,11,16",
+    ],
+    "middlegame": [
+        "W:W22,23,24,26,27,28,29,30,31:B1,2,3,5,6,10,11",
+        "W:W21,25,26,28,29,30,31,32:B1,2,3,4,6,12,13,15",
+        "W:W8,20,21,25,26,28,29,31,32:B1,3,6,12,14",
+        "W:W15,17,18,25,28,29,30,31,32:B1,2,4,5,7,8,9",
+        "W:W8,17,22,23,25,27,28,31,32:B2,3,6,9,13,16",
+        "B:W22,25,27,28,29,30,32:B1,2,3,4,6,7,8,11,12,14,21",
+    ],
+    "endgame": [
+        "W:W26,29,32:B4,8,9,20,24",
+        "B:WK7,15,16,23,24,25:B11,17",
+        "W:WK4,5,28,29:B1,17",
+        "W:W21,30:B5,10,11,20,K31",
+        "B:W10,25:B1,3,4,9,12",
+        "W:W19,28:B3,4,9,11,12,K21",
+    ],
+}
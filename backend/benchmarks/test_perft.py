@@ -0,0 +1,40 @@
+"""
+Perft suite for the move generators.
+The count tests check both engines against the reference counts in
+app.games.perft; the speed tests time both with pytest-benchmark
+(requirements-dev.txt) and are skipped without it.
+
+Usage: pytest benchmarks/test_perft.py [--benchmark-skip | --benchmark-only]
+(the two options need pytest-benchmark)
+"""
+import importlib.util
+
+import pytest
+
+from app.games.perft import ENGINES, POSITIONS, load_position, perft
+
+COUNT_DEPTH = 5  # Deepest depth the count tests check
+BENCHMARK_DEPTH = 5
+
+needs_benchmark = pytest.mark.skipif(
+    importlib.util.find_spec("pytest_benchmark") is None,
+    reason="pytest-benchmark is not installed"
+)
+
+
+@pytest.mark.parametrize("engine_name", sorted(ENGINES))
+@pytest.mark.parametrize("name", list(POSITIONS))
+def test_perft_counts(name, engine_name):
+    fen, reference = POSITIONS[name]
+    engine = load_position(fen, engine_name)
+    for depth in range(1, min(COUNT_DEPTH, len(reference)) + 1):
+        assert perft(engine, depth) == reference[depth - 1], f"depth {depth}"
+
+
+@needs_benchmark
+@pytest.mark.parametrize("engine_name", sorted(ENGINES))
+@pytest.mark.parametrize("name", list(POSITIONS))
+def test_perft_speed(benchmark, name, engine_name):
+    fen, reference = POSITIONS[name]
+    engine = load_position(fen, engine_name)
+    assert benchmark(perft, engine, BENCHMARK_DEPTH) == reference[BENCHMARK_DEPTH - 1]
@@ -0,0 +1,5 @@
+"""pytest setup for the unit tests: import the app from the backend."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,91 @@
+"""
+Process executor tests, with in-process pools standing in for the worker
+processes: abandoned searches count against the queue until a worker is
+done with them, the fallback answers without searching, and each game's
+searches and table discards go to one worker.
+"""
+import os
+
+os.environ.setdefault("SECRET_KEY", "test")
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.games.draughts_engine import DraughtsEngine
+from app.services import ai_executor
+from app.services.ai_executor import ProcessPoolAIExecutor
+
+
+def test_abandoned_search_stays_pending(monkeypatch):
+    finish = threading.Event()
+    searches = []
+    
+    def slow_search(*args):
+        searches.append(args)
+        finish.wait(5)
+        return None, None
+    
+    monkeypatch.setattr(ai_executor, "run_search", slow_search)
+    executor = ProcessPoolAIExecutor(workers=1, max_queue=1, job_timeout=0.05)
+    executor.pools = [ThreadPoolExecutor(max_workers=1)]
+    board_state = DraughtsEngine().get_board_state()
+    legal = DraughtsEngine().get_all_valid_moves_for_player(1)
+    
+    async def play():
+        # Times out: answered by the fallback, the search still running
+        move = await executor.get_best_move(1, board_state, "medium")
+        assert move in legal
+        assert executor.pending == 1
+        
+        # The queue is full until the worker is done
+        move = await executor.get_best_move(2, board_state, "medium")
+        assert move in legal
+        assert len(searches) == 1
+    
+    try:
+        asyncio.run(play())
+        finish.set()
+        executor.pools[0].shutdown(wait=True)
+        assert executor.pending == 0
+    finally:
+        finish.set()
+        executor.pools[0].shutdown(wait=False)
+
+
+def test_quick_move_is_legal():
+    engine = DraughtsEngine()
+    for _ in range(10):
+        move = ai_executor.quick_move(engine.get_board_state())
+        assert move in engine.get_all_valid_moves_for_player(engine.current_player)
+        engine.push_move(move)
+
+
+class RecordingPool:
+    """A worker pool that runs jobs at once and records them."""
+    
+    def __init__(self):
+        self.jobs = []
+    
+    def submit(self, function, *args):
+        self.jobs.append((function.__name__, args[0]))
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+
+def test_games_are_pinned_to_a_worker(monkeypatch):
+    monkeypatch.setattr(ai_executor, "run_search", lambda *args: (None, None))
+    executor = ProcessPoolAIExecutor(workers=3, max_queue=8, job_timeout=5)
+    executor.pools = [RecordingPool() for _ in range(3)]
+    board_state = DraughtsEngine().get_board_state()
+    
+    async def play():
+        for game_id in (4, 5, 4, 4):
+            await executor.get_best_move(game_id, board_state, "medium")
+    
+    asyncio.run(play())
+    executor.discard_table(4)
+    assert executor.pools[0].jobs == []
+    assert executor.pools[1].jobs == [("<lambda>", 4)] * 3 + [("_discard_table", 4)]
+    assert executor.pools[2].jobs == [("<lambda>", 5)]
@@ -0,0 +1,57 @@
+"""
+Batch evaluator tests: BatchEvaluator scores positions as evaluate_board
+does, and the search picks the same moves with it. Skipped without NumPy.
+"""
+import os
+
+os.environ.setdefault("SECRET_KEY", "test")
+
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.games.batch_eval import BatchEvaluator, encode_board
+from app.games.bitboard_engine import BitboardEngine
+from app.games.draughts_ai import DraughtsAI
+from app.games.draughts_engine import DraughtsEngine
+
+
+def load(engine_class, board_state: dict):
+    engine = engine_class()
+    engine.set_board_state(board_state)
+    return engine
+
+
+def played_positions(count: int = 200):
+    """Board states from random games, kings included."""
+    rng = random.Random(7)
+    states = []
+    while len(states) < count:
+        engine = DraughtsEngine()
+        for _ in range(120):
+            moves = engine.get_all_valid_moves_for_player(engine.current_player)
+            if not moves:
+                break
+            engine.push_move(rng.choice(moves))
+            states.append(engine.get_board_state())
+    return states[:count]
+
+
+@pytest.mark.parametrize("player", [1, 2])
+def test_batch_scores_match_evaluate_board(player):
+    engines = [load(DraughtsEngine, board_state) for board_state in played_positions()]
+    assert any(piece < 0 for engine in engines for row in engine.board for piece in row)
+    scores = BatchEvaluator().evaluate([encode_board(engine.board) for engine in engines], player)
+    assert scores.tolist() == [engine.evaluate_board(player) for engine in engines]
+
+
+def test_search_picks_the_same_moves():
+    for board_state in played_positions(40)[::8]:
+        moves = []
+        for batch_evaluator in (None, BatchEvaluator()):
+            ai = DraughtsAI("medium", time_budget=float("inf"), batch_evaluator=batch_evaluator)
+            ai.random_moves = False
+            moves.append(ai.get_best_move(load(BitboardEngine, board_state)))
+        assert moves[0] == moves[1]
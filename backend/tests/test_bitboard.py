@@ -0,0 +1,51 @@
+"""
+Equivalence tests for BitboardEngine: on every ply of random playouts it
+must generate the same moves, in the same order, and reach the same board,
+hash, result and evaluation as DraughtsEngine.
+"""
+import random
+
+import pytest
+
+from app.games.bitboard_engine import BitboardEngine
+from app.games.draughts_engine import DraughtsEngine
+from app.games.perft import POSITIONS, divide, load_position
+
+DIVIDE_DEPTH = 4
+MAX_PLIES = 200
+
+
+def assert_same_position(draughts, bitboard):
+    assert bitboard.board == draughts.board
+    assert bitboard.current_player == draughts.current_player
+    assert bitboard.hash == draughts.hash
+    assert bitboard.is_game_over() == draughts.is_game_over()
+    for player in (1, 2):
+        assert bitboard.evaluate_board(player) == pytest.approx(draughts.evaluate_board(player))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_playouts_match(seed):
+    rng = random.Random(seed)
+    draughts, bitboard = DraughtsEngine(), BitboardEngine()
+    assert_same_position(draughts, bitboard)
+    
+    while len(draughts.move_history) < MAX_PLIES and not draughts.is_game_over()[0]:
+        moves = draughts.get_all_valid_moves_for_player(draughts.current_player)
+        assert bitboard.get_all_valid_moves_for_player(bitboard.current_player) == moves
+        move = rng.choice(moves)
+        draughts.push_move(move)
+        bitboard.push_move(move)
+        assert_same_position(draughts, bitboard)
+        assert bitboard.move_history[-1] == draughts.move_history[-1]
+    
+    while bitboard.undo_stack:
+        draughts.pop_move()
+        bitboard.pop_move()
+        assert_same_position(draughts, bitboard)
+
+
+@pytest.mark.parametrize("name", list(POSITIONS))
+def test_divide_matches(name):
+    fen, _ = POSITIONS[name]
+    assert divide(load_position(fen, "bitboard"), DIVIDE_DEPTH) == divide(load_position(fen), DIVIDE_DEPTH)
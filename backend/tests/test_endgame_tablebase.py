@@ -0,0 +1,46 @@
+"""
+Endgame tablebase tests: the file format round trip, distances beyond a
+byte, and the search scores of probes.
+"""
+import os
+
+os.environ.setdefault("SECRET_KEY", "test")
+
+from app.games.endgame_tablebase import (
+    DRAW,
+    LOSS,
+    MAX_DISTANCE,
+    WIN,
+    _decode,
+    _encode,
+    build_tablebase,
+    load_tablebase,
+    probe_score,
+    write_tablebase
+)
+
+
+def test_file_round_trip(tmp_path):
+    tables = build_tablebase(2)
+    path = str(tmp_path / "tablebase.bin")
+    write_tablebase(path, tables)
+    loaded = load_tablebase(path)
+    assert set(loaded.tables) == set(tables)
+    for signature, table in tables.items():
+        assert list(loaded.tables[signature]) == list(table)
+
+
+def test_long_distances_encode():
+    for result in (WIN, LOSS):
+        for distance in (1, 127, 128, 1000, MAX_DISTANCE):
+            assert _decode(_encode(result, distance)) == (result, distance)
+    assert _decode(0) == (DRAW, 0)
+
+
+def test_probe_scores_order_wins_by_distance():
+    scores = [probe_score(WIN, distance) for distance in (0, 1, 127, 128, MAX_DISTANCE)]
+    assert scores == sorted(scores, reverse=True)
+    assert len(set(scores)) == len(scores)
+    assert 500 < scores[-1] and scores[0] <= 1000
+    assert probe_score(LOSS, 5) == -probe_score(WIN, 5)
+    assert probe_score(DRAW, 0) == 0
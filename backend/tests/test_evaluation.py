@@ -0,0 +1,36 @@
+"""
+Incremental evaluation tests: the terms and piece squares DraughtsEngine
+keeps up to date through push_move and pop_move must match a full board
+scan on every ply of random playouts.
+"""
+import random
+
+import pytest
+
+from app.games.draughts_engine import DraughtsEngine
+
+MAX_PLIES = 200
+
+
+def assert_consistent(engine):
+    for player in (1, 2):
+        assert engine.evaluation_terms(player) == engine.evaluation_terms(player, recompute=True)
+    assert engine.piece_squares == engine.scan_material()[0]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_terms_match_recompute(seed):
+    rng = random.Random(seed)
+    engine = DraughtsEngine()
+    assert_consistent(engine)
+    
+    plies = 0
+    while plies < MAX_PLIES and not engine.is_game_over()[0]:
+        engine.push_move(rng.choice(engine.get_all_valid_moves_for_player(engine.current_player)))
+        plies += 1
+        assert_consistent(engine)
+    
+    for _ in range(plies):
+        engine.pop_move()
+        assert_consistent(engine)
+    assert engine.board == DraughtsEngine().board
@@ -0,0 +1,59 @@
+"""
+Game clock tests: a move costs the mover the time it took, to the fraction
+of a second, plus the increment.
+"""
+import os
+
+os.environ.setdefault("SECRET_KEY", "test")
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.models import Game, GameMode, GameStatus
+from app.services import game_clock
+
+
+def timed_game(started: datetime) -> Game:
+    return Game(
+        id=1,
+        player1_id=1,
+        player2_id=2,
+        mode=GameMode.VS_PLAYER,
+        status=GameStatus.IN_PROGRESS,
+        current_turn=1,
+        time_control=600,
+        time_increment=5,
+        player1_time_left=600,
+        player2_time_left=600,
+        last_move_time=started
+    )
+
+
+@pytest.mark.parametrize("seconds", [0.1, 0.4, 0.6, 2.3])
+def test_charge_costs_the_time_taken(seconds):
+    started = datetime(2024, 1, 1, 12, 0, 0)
+    game = timed_game(started)
+    moved = started + timedelta(seconds=seconds)
+    game_clock.charge(game, moved)
+    assert game.player1_time_left == pytest.approx(600 - seconds + 5)
+    assert game.player2_time_left == 600
+    assert game.last_move_time == moved
+
+
+def test_quick_moves_do_not_gain_time():
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    game = timed_game(now)
+    game.time_increment = 0
+    for _ in range(10):
+        now += timedelta(seconds=0.3)
+        game_clock.charge(game, now)
+        game.current_turn = 1  # The same player again, to add up their charges
+    assert game.player1_time_left == pytest.approx(597)
+
+
+def test_charge_stops_at_zero():
+    started = datetime(2024, 1, 1, 12, 0, 0)
+    game = timed_game(started)
+    game_clock.charge(game, started + timedelta(seconds=700))
+    assert game.player1_time_left == 5
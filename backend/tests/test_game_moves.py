@@ -0,0 +1,102 @@
+"""
+game_moves tests: legacy move_history arrays, recorded when a capture was
+a single jump that ended the turn, are migrated and replayed.
+"""
+import os
+
+os.environ.setdefault("SECRET_KEY", "test")
+
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.database import Base
+from app.games.draughts_engine import DraughtsEngine
+from app.models.models import Game, GameMode, GameStatus, MoveRecord, User
+from app.services.game_moves import iter_moves, migrate_games, replay
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def legacy_capture_history():
+    """
+    A legacy move_history played to a multi-jump, of which only the first
+    hop is recorded, as the old engine ended the turn after one jump.
+    Returns (history, board after the hop).
+    """
+    for seed in range(100):
+        rng = random.Random(seed)
+        engine = DraughtsEngine()
+        history = []
+        for _ in range(80):
+            moves = engine.get_all_valid_moves_for_player(engine.current_player)
+            if not moves:
+                break
+            chains = [move for move in moves if len(move) > 2]
+            if chains:
+                hop = chains[0][:2]
+                engine.push_move(hop)
+                history.append({"from": list(hop[0]), "to": list(hop[1]), "player": 3 - engine.current_player, "capture": True})
+                return history, [row[:] for row in engine.board]
+            move = rng.choice(moves)
+            engine.make_move(move[0], move[-1], list(move[1:-1]))
+            record = engine.move_history[-1]
+            history.append({"from": list(record["from"]), "to": list(record["to"]), "player": record["player"], "capture": record["capture"]})
+    pytest.fail("No multi-jump found")
+
+
+def add_game(db, history) -> int:
+    user = db.query(User).first()
+    if user is None:
+        user = User(username="alice", email="alice@example.com", hashed_password="x", balance=100)
+        db.add(user)
+        db.commit()
+    game = Game(
+        player1_id=user.id,
+        mode=GameMode.VS_AI,
+        bet_amount=5,
+        status=GameStatus.COMPLETED,
+        move_history=history
+    )
+    db.add(game)
+    db.commit()
+    # migrate_games detaches the session's objects
+    return game.id
+
+
+def test_legacy_capture_is_migrated_and_replayed(db):
+    history, board = legacy_capture_history()
+    game_id = add_game(db, history)
+    
+    games, rows, skipped = migrate_games(db)
+    assert (games, rows, skipped) == (1, len(history), [])
+    assert db.query(MoveRecord).filter(MoveRecord.game_id == game_id).count() == len(history)
+    
+    engine = replay(iter_moves(db, game_id))
+    assert len(engine.move_history) == len(history)
+    assert engine.board == board
+    
+    engine = replay(iter_moves(db, game_id), ply=len(history) - 1)
+    assert len(engine.move_history) == len(history) - 1
+
+
+def test_unplayable_history_is_left_out(db):
+    history, _ = legacy_capture_history()
+    good_id = add_game(db, history)
+    # Player 1 moving a piece that is not there
+    bad_id = add_game(db, [{"from": [3, 0], "to": [2, 1], "player": 1, "capture": False}])
+    
+    games, rows, skipped = migrate_games(db)
+    assert (games, rows, skipped) == (1, len(history), [bad_id])
+    assert db.query(MoveRecord).filter(MoveRecord.game_id == good_id).count() == len(history)
+    assert db.query(MoveRecord).filter(MoveRecord.game_id == bad_id).count() == 0
@@ -0,0 +1,65 @@
+"""
+Live game store tests: moves written to game_moves exactly once, however
+many flushes share a transaction.
+"""
+import os
+
+os.environ.setdefault("SECRET_KEY", "test")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.database import Base
+from app.games.draughts_engine import DraughtsEngine
+from app.models.models import Game, GameMode, GameStatus, MoveRecord, User
+from app.services import game_service
+from app.services.game_service import GameService
+from app.services.game_store import GameStore, MemoryMoveLog
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = GameStore(MemoryMoveLog(), flush_moves=1)
+    monkeypatch.setattr(game_service, "game_store", store)
+    return store
+
+
+def test_human_and_ai_moves_flush_once(db, store):
+    user = User(username="alice", email="alice@example.com", hashed_password="x", balance=100)
+    db.add(user)
+    db.commit()
+    game = Game(
+        player1_id=user.id,
+        mode=GameMode.VS_AI,
+        bet_amount=5,
+        status=GameStatus.IN_PROGRESS,
+        current_turn=user.id,
+        board_state=DraughtsEngine().get_board_state(compact=True)
+    )
+    db.add(game)
+    db.commit()
+    
+    for _ in range(3):
+        # Both flush before the one commit, as in make_move_async
+        move = store.load(game).engine.get_all_valid_moves_for_player(1)[0]
+        game, live, error = GameService.play_move(db, game.id, user.id, move[0], move[-1], list(move[1:-1]))
+        assert error is None
+        reply = live.engine.get_all_valid_moves_for_player(2)[0]
+        GameService.play_ai_move(db, game, live, reply)
+        db.commit()
+        store.committed(game.id)
+    
+    plies = [ply for ply, in db.query(MoveRecord.ply).filter(MoveRecord.game_id == game.id).order_by(MoveRecord.ply)]
+    assert plies == list(range(1, 7))
+    assert store.stored_plies(game) == 6
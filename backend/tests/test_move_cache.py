@@ -0,0 +1,43 @@
+"""
+Legal move cache tests: lookups from many threads at once, with a cache
+small enough that entries are evicted all the time.
+"""
+import random
+import threading
+
+from app.games.draughts_engine import DraughtsEngine
+from app.games.move_cache import LegalMoveCache
+
+THREADS = 8
+PLAYOUTS = 20
+MAX_PLIES = 60
+
+
+def test_concurrent_lookups():
+    cache = LegalMoveCache(max_size=4)
+    errors = []
+    
+    def play(seed: int):
+        rng = random.Random(seed)
+        try:
+            for _ in range(PLAYOUTS):
+                engine = DraughtsEngine()
+                for _ in range(MAX_PLIES):
+                    moves = cache.get_moves(engine)
+                    assert list(moves) == engine.get_all_valid_moves_for_player(engine.current_player)
+                    if not moves:
+                        break
+                    engine.push_move(rng.choice(moves))
+        except Exception as error:
+            errors.append(error)
+    
+    threads = [threading.Thread(target=play, args=(seed,)) for seed in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    stats = cache.stats()
+    assert stats["size"] <= 4
+    assert stats["hits"] + stats["misses"] > 0
@@ -0,0 +1,37 @@
+"""
+Opening book tests: results read from completed games, and the weights
+they give the book's moves.
+"""
+from app.games.draughts_engine import DraughtsEngine
+from app.games.opening_book import WEIGHT_PLAYED, WEIGHT_WON, build_opening_book, game_result
+
+
+def test_game_result():
+    # Human wins
+    assert game_result(False, 7, 7, False) == 1
+    assert game_result(False, 8, 7, False) == 2
+    assert game_result(True, 7, 7, False) == 1
+    # The AI's wins leave winner_id empty
+    assert game_result(True, None, 7, False) == 2
+    # Draws
+    assert game_result(True, None, 7, True) == 0
+    assert game_result(False, None, 7, True) == 0
+    # No result
+    assert game_result(False, None, 7, False) is None
+
+
+def test_ai_wins_weigh_the_ai_moves():
+    engine = DraughtsEngine()
+    history = []
+    for _ in range(2):
+        move = engine.get_all_valid_moves_for_player(engine.current_player)[0]
+        engine.make_move(move[0], move[-1])
+        history.append({"from": list(move[0]), "to": list(move[-1])})
+    
+    book = build_opening_book([(history, game_result(True, None, 7, False))])
+    start = DraughtsEngine()
+    first = (tuple(history[0]["from"]), tuple(history[0]["to"]))
+    assert book[start.hash][first] == WEIGHT_PLAYED
+    start.make_move(*first)
+    second = (tuple(history[1]["from"]), tuple(history[1]["to"]))
+    assert book[start.hash][second] == WEIGHT_PLAYED + WEIGHT_WON